@@ -738,6 +738,9 @@ class SourcesPool:
         else:
             return downloadAndUnzip(opener, url, area, source)
 
+    def close(self) -> None:
+        self._real_pool.close()
+
 
 def getFiles(
     area: str,
@@ -756,16 +759,20 @@ def getFiles(
         opener = earthexplorerLogin(configuration)
     else:
         opener = None
-    for area, checkPoly in areaPrefixes:
-        for source in sources:
-            print("{0:s}: trying {1:s} ...".format(area, source))
-            saveFilename = sources_pool.get_file(opener, area, source)
-            if saveFilename:
-                files.append((saveFilename, checkPoly))
-                break
-        else:
-            print("{0:s}: no file found on server.".format(area))
-            continue
+    try:
+        for area, checkPoly in areaPrefixes:
+            for source in sources:
+                print("{0:s}: trying {1:s} ...".format(area, source))
+                saveFilename = sources_pool.get_file(opener, area, source)
+                if saveFilename:
+                    files.append((saveFilename, checkPoly))
+                    break
+            else:
+                print("{0:s}: no file found on server.".format(area))
+                continue
+    finally:
+        # Release sources' network connections, no longer needed
+        sources_pool.close()
     return files
 
 
@@ -6,9 +6,8 @@ from typing import cast
 
 from configargparse import ArgumentParser
 
-from pyhgtmap import NASASRTMUtil, __version__
+from pyhgtmap import __version__
 from pyhgtmap.configuration import CONFIG_FILENAME, Configuration, NestedConfig
-from pyhgtmap.hgt.file import parse_polygons_file
 from pyhgtmap.sources import Source
 from pyhgtmap.sources.pool import Pool
 
@@ -18,6 +17,9 @@ ALL_SUPPORTED_SOURCES = [
     "srtm3",
     *Pool.available_sources_options(),
 ]
+SUPPORTED_SRTM_VERSIONS = frozenset((2.1, 3.0))
+SUPPORTED_SRTM_RESOLUTIONS = frozenset((1, 3))
+SUPPORTED_VIEWFINDER_RESOLUTIONS = frozenset((0, 1, 3))
 
 
 def build_common_parser() -> ArgumentParser:
@@ -147,6 +149,15 @@ def build_common_parser() -> ArgumentParser:
         type=int,
         default=1,
     )
+    parser.add_argument(
+        "--pin-workers",
+        help="pin each parallel job to a single CPU, to avoid its migration"
+        "\nbetween cores (Linux only).  Not suited to concurrent runs on the same"
+        "\nhost, as their jobs would be pinned to the same CPUs.",
+        dest="pinWorkers",
+        action="store_true",
+        default=False,
+    )
     parser.add_argument(
         "--osm-version",
         help="pass a number as OSM-VERSION to"
@@ -261,7 +272,8 @@ def build_common_parser() -> ArgumentParser:
         help="turn on gzip compression of output files."
         "\nThis reduces the needed disk space but results in higher computation"
         "\ntimes. Specify an integer between 1 and 9.  1 means low compression and"
-        "\nfaster computation, 9 means high compression and lower computation.",
+        "\nfaster computation, 9 means high compression and lower computation."
+        "\nOn OSM XML, 6 gets almost the size of 9 in a fraction of its time.",
         dest="gzip",
         action="store",
         default=0,
@@ -468,16 +480,18 @@ def parse_command_line(sys_args: list[str]) -> tuple[Configuration, list[str]]:
 
     opts: Configuration = parser.parse_args(sys_args, namespace=root_configuration)
 
+    # Heavy modules (numpy, matplotlib...) are imported only once the command line
+    # is parsed, as they're not needed for --help or --version
+    from pyhgtmap import NASASRTMUtil
+    from pyhgtmap.hgt.file import parse_polygons_file
+
     if opts.hgtdir:  # Set custom ./hgt/ directory
         NASASRTMUtil.NASASRTMUtilConfig.CustomHgtSaveDir(opts.hgtdir)
     if opts.rewriteIndices:
         NASASRTMUtil.rewriteIndices()
         sys.exit(0)
 
-    for supportedVersion in [2.1, 3]:
-        if opts.srtmVersion == supportedVersion:
-            break
-    else:
+    if opts.srtmVersion not in SUPPORTED_SRTM_VERSIONS:
         # unsupported SRTM data version
         sys.stderr.write(
             f"Unsupported SRTM data version '{opts.srtmVersion:.1f}'.  See the"
@@ -485,13 +499,13 @@ def parse_command_line(sys_args: list[str]) -> tuple[Configuration, list[str]]:
         )
         parser.print_help()
         sys.exit(1)
-    if opts.srtmResolution not in [1, 3]:
+    if opts.srtmResolution not in SUPPORTED_SRTM_RESOLUTIONS:
         sys.stderr.write(
             "The --srtm option can only take '1' or '3' as values."
             "  Defaulting to 3.\n",
         )
         opts.srtmResolution = 3
-    if opts.viewfinder not in [0, 1, 3]:
+    if opts.viewfinder not in SUPPORTED_VIEWFINDER_RESOLUTIONS:
         sys.stderr.write(
             "The --viewfinder-mask option can only take '1' or '3' as values."
             "  Won't use viewfinder data.\n",
@@ -502,11 +516,11 @@ def parse_command_line(sys_args: list[str]) -> tuple[Configuration, list[str]]:
             if s[:5] not in ALL_SUPPORTED_SOURCES:
                 print(f"Unknown data source: {s:s}")
                 sys.exit(1)
-            elif s in ["srtm1", "srtm3"]:
-                while s in opts.dataSource:
-                    opts.dataSource[opts.dataSource.index(s)] = (
-                        f"{s:s}v{opts.srtmVersion:.1f}"
-                    )
+        # Add the SRTM version to plain SRTM sources
+        opts.dataSource = [
+            f"{s:s}v{opts.srtmVersion:.1f}" if s in ("srtm1", "srtm3") else s
+            for s in opts.dataSource
+        ]
     elif len(opts.filenames) == 0:
         # No explicit source nor input provided, try to download using default
         opts.dataSource = []
@@ -53,6 +53,7 @@ class Configuration(NestedConfig):
     plotPrefix: str | None
     lineCats: str = "200,100"
     nJobs: int = 1
+    pinWorkers: bool = False
     osmVersion: float = 0.6
     writeTimestamp: bool = False
     startId: int = 10000000
@@ -28,11 +28,32 @@ def simplify_path(
     # most (but not all) of the useless points anyway...
     # On the whole France-PACA region, the delta is less than 0.05% when adding the dedupe to a RDP with epsion = 0.0...
     # deduped_path = input_path[numpy.any(input_path != numpy.r_[input_path[1:], [[None,None]]], axis=1)]
-    if rdp_epsilon is not None:
+    # Paths with less than 3 points can't be simplified; skip the native call overhead
+    if rdp_epsilon is not None and len(deduped_path) > 2:
         deduped_path = rdp(deduped_path, epsilon=rdp_epsilon)
     return deduped_path
 
 
+def is_closed_path(path: numpy.ndarray) -> bool:
+    """returns True if the first and last points of <path> are the same.
+    Comparing scalars is way faster than a numpy reduction on 2 points arrays."""
+    return bool(path[0, 0] == path[-1, 0] and path[0, 1] == path[-1, 1])
+
+
+def paths_lengths(paths: list[numpy.ndarray]) -> numpy.ndarray:
+    """Compute the length of each of the given paths, in a single vectorized pass."""
+    if not paths:
+        return numpy.empty(0)
+    points = numpy.concatenate(paths)
+    segments_lengths = numpy.hypot(*numpy.diff(points, axis=0).T)
+    # Length from first point to each point; segments joining consecutive paths are
+    # counted here but cancel out when subtracting
+    cumulated_lengths = numpy.concatenate(([0.0], numpy.cumsum(segments_lengths)))
+    ends = numpy.cumsum([len(path) for path in paths]) - 1
+    starts = numpy.concatenate(([0], ends[:-1] + 1))
+    return cumulated_lengths[ends] - cumulated_lengths[starts]
+
+
 class ContoursGenerator:
     def __init__(
         self,
@@ -105,7 +126,7 @@ class ContoursGenerator:
             if len(path) == 0:
                 # self._cutBeginning() returned an empty list for this path
                 continue
-            if numpy.all(path[0] == path[-1]):
+            if is_closed_path(path):
                 # a closed path with at least 3 nodes
                 numOfClosedPaths += 1
             pathList.append(path)
@@ -129,10 +150,19 @@ class ContoursGenerator:
         )
         numOfPaths, numOfNodes = 0, 0
         resultPaths = []
-        for path in rawPaths:
-            if self.transform:
-                path = numpy.array(self.transform(path))
-            path = simplify_path(path, self.rdp_epsilon)
+        if self.transform:
+            rawPaths = [numpy.array(self.transform(path)) for path in rawPaths]
+        if self.rdp_epsilon:
+            # Every point of an open path shorter than epsilon is closer than epsilon
+            # to its ends: RDP would keep only them
+            short_paths = paths_lengths(rawPaths) < self.rdp_epsilon
+        else:
+            short_paths = numpy.zeros(len(rawPaths), dtype=bool)
+        for path, is_short in zip(rawPaths, short_paths):
+            if is_short and not is_closed_path(path):
+                path = path[[0, -1]]
+            else:
+                path = simplify_path(path, self.rdp_epsilon)
             splitPaths, numOfNodesAdd, numOfPathsAdd = self.splitList(path)
             resultPaths.extend(splitPaths)
             numOfPaths += numOfPathsAdd
@@ -149,21 +149,55 @@ def get_transform(
     if nAuth == oAuth:
         return None
     else:
+        # WKT2 preserves the projections definitions without loss
+        n_wkt = n.ExportToWkt(["FORMAT=WKT2"])
+        file_proj_wkt = file_proj.ExportToWkt(["FORMAT=WKT2"])
         if reverse:
-            t = osr.CoordinateTransformation(n, file_proj)
+            return CoordinatesTransform(n_wkt, file_proj_wkt)
         else:
-            t = osr.CoordinateTransformation(file_proj, n)
-
-        def transform(
-            points: Iterable[Coordinates],
-        ) -> Iterable[Coordinates]:
-            return [
-                Coordinates(*p[:2])
-                for p in t.TransformPoints(points)
-                if not any(el == float("inf") for el in p[:2])
-            ]
+            return CoordinatesTransform(file_proj_wkt, n_wkt)
+
+
+class CoordinatesTransform:
+    """
+    Transform the coordinate system of a list of points, from a source projection to
+    a destination one.
+    Projections are kept as WKT strings so that the transform (and the tiles referencing
+    it) can be pickled to be processed in another process.
+    """
+
+    def __init__(self, src_wkt: str, dst_wkt: str) -> None:
+        self.src_wkt = src_wkt
+        self.dst_wkt = dst_wkt
+        self._transformation: osr.CoordinateTransformation | None = None
 
-        return transform
+    def __getstate__(self) -> tuple[str, str]:
+        # GDAL objects can't be pickled; rebuild transformation on first use
+        return self.src_wkt, self.dst_wkt
+
+    def __setstate__(self, state: tuple[str, str]) -> None:
+        self.src_wkt, self.dst_wkt = state
+        self._transformation = None
+
+    def _build_transformation(self) -> osr.CoordinateTransformation:
+        from osgeo import osr
+
+        src_proj = osr.SpatialReference()
+        src_proj.SetAxisMappingStrategy(osr.OAMS_TRADITIONAL_GIS_ORDER)
+        src_proj.ImportFromWkt(self.src_wkt)
+        dst_proj = osr.SpatialReference()
+        dst_proj.SetAxisMappingStrategy(osr.OAMS_TRADITIONAL_GIS_ORDER)
+        dst_proj.ImportFromWkt(self.dst_wkt)
+        return osr.CoordinateTransformation(src_proj, dst_proj)
+
+    def __call__(self, points: Iterable[Coordinates]) -> Iterable[Coordinates]:
+        if self._transformation is None:
+            self._transformation = self._build_transformation()
+        return [
+            Coordinates(*p[:2])
+            for p in self._transformation.TransformPoints(points)
+            if not any(el == float("inf") for el in p[:2])
+        ]
 
 
 def parse_geotiff_bbox(
@@ -386,6 +420,35 @@ def super_sample(
     return out_data, out_mask
 
 
+def build_z_data(
+    raw_data: numpy.ndarray,
+    void_max: int,
+    smooth_ratio: float,
+    feet_steps: bool,
+) -> numpy.ma.masked_array:
+    """Convert raw elevation data into a masked array, masking void values and
+    converting elevations to feet if required.
+
+    When no smoothing is requested, the conversion to feet is fused into the cast of
+    raw data, to avoid a separate pass over the whole array. Elevations in feet are
+    float64, elevations in meters float32.
+    """
+    # Compute mask BEFORE zooming, due to zoom artifacts on void areas boundaries
+    void_mask = numpy.asarray(raw_data <= void_max)
+    if smooth_ratio != 1:
+        z_data, void_mask = super_sample(
+            raw_data.astype(numpy.float32), void_mask, smooth_ratio
+        )
+        if feet_steps:
+            # Elevations are rounded in meters by super_sample; convert them afterwards
+            z_data = numpy.multiply(z_data, meters2Feet, dtype=numpy.float64)
+    elif feet_steps:
+        z_data = numpy.multiply(raw_data, meters2Feet, dtype=numpy.float64)
+    else:
+        z_data = raw_data.astype(numpy.float32)
+    return numpy.ma.array(z_data, mask=void_mask, fill_value=float("NaN"))
+
+
 class HgtFile:
     """is a handle for SRTM data files"""
 
@@ -465,24 +528,15 @@ class HgtFile:
         try:
             numOfDataPoints = os.path.getsize(self.fullFilename) / 2
             self.numOfRows = self.numOfCols = int(numOfDataPoints**0.5)
-            raw_z_data = (
-                numpy.fromfile(self.fullFilename, dtype=">i2")
-                .reshape(self.numOfRows, self.numOfCols)
-                .astype("float32")
-            )
-
-            # Compute mask BEFORE zooming, due to zoom artifacts on void areas boundaries
-            voidMask = numpy.asarray(numpy.where(raw_z_data <= voidMax, True, False))
-            if smooth_ratio != 1:
-                raw_z_data, voidMask = super_sample(raw_z_data, voidMask, smooth_ratio)
-                self.numOfRows, self.numOfCols = raw_z_data.shape
-            self.zData = numpy.ma.array(
-                raw_z_data,
-                mask=voidMask,
-                fill_value=float("NaN"),
-            )
-            if self.feetSteps:
-                self.zData = self.zData * meters2Feet
+            with open(self.fullFilename, "rb") as hgt_file:
+                if hasattr(os, "posix_fadvise"):
+                    # Whole file is read at once; let the kernel read ahead aggressively
+                    os.posix_fadvise(hgt_file.fileno(), 0, 0, os.POSIX_FADV_SEQUENTIAL)
+                raw_z_data = numpy.fromfile(hgt_file, dtype=">i2").reshape(
+                    self.numOfRows, self.numOfCols
+                )
+            self.zData = build_z_data(raw_z_data, voidMax, smooth_ratio, self.feetSteps)
+            self.numOfRows, self.numOfCols = self.zData.shape
         finally:
             self.lonIncrement = 1.0 / (self.numOfCols - 1)
             self.latIncrement = 1.0 / (self.numOfRows - 1)
@@ -525,19 +579,10 @@ class HgtFile:
             self.numOfCols = g.RasterXSize
             self.numOfRows = g.RasterYSize
             # init z data
-            raw_z_data = g.GetRasterBand(1).ReadAsArray().astype("float32")
-            # Compute mask BEFORE zooming, due to zoom artifacts on void areas boundaries
-            voidMask = numpy.asarray(numpy.where(raw_z_data <= voidMax, True, False))
-            if smooth_ratio != 1:
-                raw_z_data, voidMask = super_sample(raw_z_data, voidMask, smooth_ratio)
-                self.numOfRows, self.numOfCols = raw_z_data.shape
-            self.zData = numpy.ma.array(
-                raw_z_data,
-                mask=voidMask,
-                fill_value=float("NaN"),
+            self.zData = build_z_data(
+                g.GetRasterBand(1).ReadAsArray(), voidMax, smooth_ratio, self.feetSteps
             )
-            if self.feetSteps:
-                self.zData = self.zData * meters2Feet
+            self.numOfRows, self.numOfCols = self.zData.shape
             # make x and y data
             self.lonIncrement = geoTransform[1]
             self.latIncrement = -geoTransform[5]
@@ -668,7 +713,7 @@ class HgtFile:
                 estimatedNumOfNodes = numpy.nansum(xHelpData) + numpy.nansum(yHelpData)
                 return estimatedNumOfNodes
 
-            def too_many_nodes(data: numpy.ma.masked_array) -> bool:
+            def too_many_nodes(estimated_nb_nodes: int) -> bool:
                 """returns True if the estimated number of nodes is greater than
                 <maxNodes> and False otherwise.  <maxNodes> defaults to 1000000,
                 which is an approximate limit for correct handling of osm files
@@ -676,7 +721,7 @@ class HgtFile:
                 """
                 if maxNodes == 0:
                     return False
-                return estim_num_of_nodes(data) > maxNodes
+                return estimated_nb_nodes > maxNodes
 
             def get_chops(
                 unchoppedData: numpy.ma.masked_array, unchoppedBbox
@@ -724,7 +769,10 @@ class HgtFile:
                     # this tile is full of void values, so discard this tile
                     return
 
-            if too_many_nodes(inputData):
+            # Estimation is only needed when tiling is enabled; it's kept in the tile
+            # to allow scheduling the biggest tiles first
+            estimated_nb_nodes = int(estim_num_of_nodes(inputData)) if maxNodes else 0
+            if too_many_nodes(estimated_nb_nodes):
                 chops = get_chops(inputData, inputBbox)
                 for choppedBbox, choppedData in chops:
                     chop_data(choppedBbox, choppedData, depth + 1)
@@ -764,6 +812,7 @@ class HgtFile:
                         polygons=tilePolygon,
                         mask=tileMask,
                         transform=self.transform,
+                        estimated_nb_nodes=estimated_nb_nodes,
                     ),
                 )
 
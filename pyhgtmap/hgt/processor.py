@@ -2,29 +2,115 @@ from __future__ import annotations
 
 import logging
 import multiprocessing
-from multiprocessing.sharedctypes import Synchronized
-from typing import TYPE_CHECKING, Callable, cast
+import os
+from concurrent.futures import (
+    ALL_COMPLETED,
+    FIRST_COMPLETED,
+    Future,
+    ProcessPoolExecutor,
+    wait,
+)
+from concurrent.futures.process import BrokenProcessPool
+from multiprocessing import resource_tracker
+from typing import TYPE_CHECKING, cast
 
 from pyhgtmap import BBox
 from pyhgtmap.hgt.file import HgtFile
+from pyhgtmap.hgt.tile import SharedHgtTile
 from pyhgtmap.output.factory import get_osm_output
 
 if TYPE_CHECKING:
-    from multiprocessing.context import ForkProcess  # type: ignore[attr-defined]
+    from collections.abc import Iterator
+    from ctypes import Array, c_longlong
 
     from pyhgtmap.configuration import Configuration
-    from pyhgtmap.hgt.tile import HgtTile
+    from pyhgtmap.hgt.tile import HgtTile, TileContours
     from pyhgtmap.output import Output
 
 logger = logging.getLogger(__name__)
 
+# Processor used by the current worker process of the pool
+_worker_processor: HgtFilesProcessor | None = None
+
+
+def _pin_worker() -> None:
+    """Pin the current pool worker to a single CPU, so that it's not migrated by the
+    scheduler between cores while processing a tile.
+    CPUs are picked among the ones available to the process (honoring cgroups limits),
+    from the worker's index in the pool."""
+    if not hasattr(os, "sched_setaffinity"):
+        return
+    # Pool workers are named "ForkProcess-<index>", index starting at 1
+    worker_index = multiprocessing.current_process().name.rsplit("-", 1)[-1]
+    if not worker_index.isdigit():
+        return
+    available_cpus = sorted(os.sched_getaffinity(0))
+    cpu = available_cpus[(int(worker_index) - 1) % len(available_cpus)]
+    try:
+        os.sched_setaffinity(0, {cpu})
+    except OSError as e:
+        logger.debug("Can't pin worker to CPU %d: %s", cpu, e)
+
+
+def _init_worker(processor: HgtFilesProcessor) -> None:
+    """Pool workers initializer, keeping a reference to the processor.
+    With the "fork" context, processor is inherited by the workers and not pickled."""
+    global _worker_processor
+    _worker_processor = processor
+    if processor.options.pinWorkers:
+        _pin_worker()
+
+
+def _process_tile_worker(file_and_tile: tuple[str, SharedHgtTile]) -> str | None:
+    """Process a single tile in a pool worker.
+
+    Returns:
+        str | None: description of the failed tile, or None on success
+    """
+    file_name, shared_tile = file_and_tile
+    try:
+        cast(HgtFilesProcessor, _worker_processor).process_tile_internal(
+            file_name, shared_tile.get_tile()
+        )
+    except Exception as e:
+        logger.exception("Exception caught in worker process: %s", e)
+        return f"{file_name}: {shared_tile}"
+    return None
+
+
+def _compute_tile_worker(
+    file_and_tile: tuple[str, SharedHgtTile],
+) -> tuple[str, BBox, TileContours] | str | None:
+    """Compute contours of a single tile in a pool worker, leaving the writing to
+    the parent process (used in single output mode).
+
+    Returns:
+        tuple[str, BBox, TileContours] | str | None: file name, tile's bounding box
+            and contours to be written, or description of the failed tile, or None
+            if there's nothing to write
+    """
+    file_name, shared_tile = file_and_tile
+    try:
+        tile = shared_tile.get_tile()
+        tile_contours = cast(HgtFilesProcessor, _worker_processor).get_tile_contours(
+            tile
+        )
+    except Exception as e:
+        logger.exception("Exception caught in worker process: %s", e)
+        return f"{file_name}: {shared_tile}"
+    if tile_contours is None:
+        return None
+    return file_name, tile.bbox(), tile_contours
+
 
 class HgtFilesProcessor:
     """
     Generate contour files from HGT (or Geotiff) files.
     One file per tile (part of input file) is generated, ensuring there's no duplicate node nor way ID
     in the output files.
-    Process can be parallelized per tile to benefit from multiple cores CPU.
+    Process can be parallelized per tile to benefit from multiple cores CPU, using a pool
+    of worker processes. In single output mode, workers only compute the contours, which
+    are written by the main process.
     """
 
     def __init__(
@@ -42,20 +128,18 @@ class HgtFilesProcessor:
             way_start_id (int): ID of the first generated way
             options (Configuration): general options
         """
-        self.next_node_id: Synchronized = cast(
-            Synchronized,
-            multiprocessing.Value("L", node_start_id),
+        # Next node and way IDs, shared between processes; held in a single array so
+        # that a tile reserves both ranges in a single critical section.
+        # A raw array with a plain (non recursive) lock is enough, as it's only
+        # accessed from reserve_ids.
+        self.ids_lock = multiprocessing.Lock()
+        self.next_ids: Array[c_longlong] = multiprocessing.RawArray(
+            "q", [node_start_id, way_start_id]
         )
-        self.next_way_id: Synchronized = cast(
-            Synchronized,
-            multiprocessing.Value("L", way_start_id),
-        )
-        self.available_children = multiprocessing.Semaphore(nb_jobs)
+        self.nb_jobs: int = nb_jobs
         self.parallel: bool = nb_jobs > 1
-        # Not joined yet children
-        self.active_children: list[ForkProcess] = []
-        # Errors raised by previously joined children
-        self.children_errors: list[tuple[int, int]] = []
+        # Tiles (or files) which processing failed
+        self.children_errors: list[str] = []
         self.options: Configuration = options
         # Common output file used in single output mode
         self.common_osm_output: Output | None = None
@@ -95,140 +179,116 @@ class HgtFilesProcessor:
 
         return osm_output
 
-    @staticmethod
-    def get_and_inc_counter(counter: Synchronized, inc_value: int) -> int:
-        """Atomically (via lock) read and increment counter synchronized between different processes.
+    def reserve_ids(self, nb_nodes: int, nb_ways: int) -> tuple[int, int]:
+        """Atomically reserve ranges of node and way IDs, shared
+        between different processes.
 
         Args:
-            counter (Synchronized): multiprocessing Synchronized int counter to increment
-            inc_value (int): increment size to add to the counter
+            nb_nodes (int): number of node IDs to reserve
+            nb_ways (int): number of way IDs to reserve
 
         Returns:
-            int: original value of the counter
+            tuple[int, int]: first reserved node ID and first reserved way ID
         """
-        with counter.get_lock():
-            previous_value = counter.value
-            counter.value += inc_value
-        return previous_value
+        with self.ids_lock:
+            node_start_id, way_start_id = self.next_ids[:]
+            self.next_ids[:] = [node_start_id + nb_nodes, way_start_id + nb_ways]
+        return node_start_id, way_start_id
 
-    def process_tile_internal(self, file_name: str, tile: HgtTile) -> None:
-        """Process a single output tile."""
-        logger.debug("process_tile %s", tile)
+    def get_tile_contours(self, tile: HgtTile) -> TileContours | None:
+        """Compute contours of a single tile.
+
+        Returns:
+            TileContours | None: tile's contours, or None if the tile doesn't need
+                to be written
+        """
+        if tile.is_constant():
+            # Quickly discard flat tiles (eg. middle of the sea)
+            logger.info("%s has a constant elevation, skipping.", tile)
+            return None
         try:
-            # Compute contours
             tile_contours = tile.get_contours(
                 step_cont=int(self.options.contourStepSize),
                 max_nodes_per_way=self.options.maxNodesPerWay,
                 no_zero=self.options.noZero,
                 rdp_epsilon=self.options.rdpEpsilon,
             )
+        except ValueError:  # tiles with the same value on every element
+            logger.warning("Discarding invalid tile %s", tile)
+            return None
 
-            if not tile_contours.nb_nodes:
-                logger.info("%s doesn't contain any node, skipping.", tile)
-                return
+        if not tile_contours.nb_nodes:
+            logger.info("%s doesn't contain any node, skipping.", tile)
+            return None
 
-            # Update counters shared among parallel processes
-            # This is the actual critical section, to avoid duplicated node IDs
-            logger.debug("Pending next_node_id_lock")
-            tile_node_start_id: int = self.get_and_inc_counter(
-                self.next_node_id,
-                tile_contours.nb_nodes,
-            )
-            tile_way_start_id: int = self.get_and_inc_counter(
-                self.next_way_id,
-                tile_contours.nb_ways,
-            )
+        return tile_contours
 
-            # Writing nodes to output is the most time & resources consuming part
-            osm_output = self.get_osm_output(
-                [
-                    file_name,
-                ],
-                tile.bbox(),
-            )
-            logger.debug("writeNodes")
-            new_start_id, ways = osm_output.write_nodes(
-                tile_contours,
-                osm_output.timestampString,
-                tile_node_start_id,
-                self.options.osmVersion,
-            )
-            logger.debug("writeWays")
-            osm_output.write_ways(ways, tile_way_start_id)
-            if not self.single_output:
-                # In single output mode, file will be finalized at the very end
-                logger.debug("done")
-                osm_output.done()
-
-            if new_start_id != tile_node_start_id + tile_contours.nb_nodes:
-                logger.warning(
-                    "new_start_id mismatch! new_start_id: %d - tile_node_start_id: %d",
-                    new_start_id,
-                    tile_node_start_id + tile_contours.nb_nodes,
-                )
-            if len(ways) != tile_contours.nb_ways:
-                logger.warning(
-                    "tile_way_start_id mismatch! len(ways): %d - tile_way_start_id: %d",
-                    len(ways),
-                    tile_way_start_id,
-                )
-        except ValueError:  # tiles with the same value on every element
-            logger.warning("Discarding invalid tile %s", tile)
+    def write_tile(
+        self, file_name: str, bbox: BBox, tile_contours: TileContours
+    ) -> None:
+        """Write contours of a single tile to the output.
 
-    def run_in_child(self, func: Callable, *args, **kwargs) -> None:
-        """
-        Basic wrapper function ensuring the available_children semaphore is properly released,
-        *once func is DONE* (and not only scheduled).
+        Args:
+            file_name (str): original file name
+            bbox (BBox): tile's bounding box
+            tile_contours (TileContours): tile's contours
         """
-        try:
-            logger.debug("run_in_child %s", func)
-            # Clear list of children PIDs we might have inherited from parent process
-            # when using fork strategy
-            self.active_children.clear()
-            func(*args, **kwargs)
-        except Exception as e:
-            logger.error("Exception caught in child process: %s", e)
-            raise e
-        finally:
-            self.available_children.release()
-            logger.debug("done - run_in_child %s", func)
+        # Update counters shared among parallel processes
+        # This is the actual critical section, to avoid duplicated node IDs
+        logger.debug("Pending ids_lock")
+        tile_node_start_id, tile_way_start_id = self.reserve_ids(
+            tile_contours.nb_nodes,
+            tile_contours.nb_ways,
+        )
 
-    def try_parallelizing(self, func: Callable, *args, **kwargs) -> None:
-        """
-        Try to parallelize func over multiple processes if enabled, else execute in current process.
-        """
-        if self.parallel and not self.single_output:
-            # Fork into a child process when available
-            logger.debug("Trying to get semaphore to run %s", func)
-            if self.available_children.acquire(block=False):
-                # Ensure "fork" method is used to share parent's process context
-                ctx = multiprocessing.get_context("fork")
-                p = ctx.Process(  # type: ignore[attr-defined]  #TODO: Windows compatibility
-                    target=self.run_in_child,
-                    args=(func, *args),
-                    kwargs=kwargs,
-                )
-                self.active_children.append(p)
-                p.start()
-                # Try to progressively clean some done children
-                self.join_children(skip_active=True)
-            else:
-                # Execute in current process
-                logger.debug("No process available to fork, continuing in current one")
-                func(*args, **kwargs)
-        else:
-            # Execute in current process
-            func(*args, **kwargs)
+        # Writing nodes to output is the most time & resources consuming part
+        osm_output = self.get_osm_output(
+            [
+                file_name,
+            ],
+            bbox,
+        )
+        logger.debug("writeNodes")
+        new_start_id, ways = osm_output.write_nodes(
+            tile_contours,
+            osm_output.timestampString,
+            tile_node_start_id,
+            self.options.osmVersion,
+        )
+        logger.debug("writeWays")
+        osm_output.write_ways(ways, tile_way_start_id)
+        if not self.single_output:
+            # In single output mode, file will be finalized at the very end
+            logger.debug("done")
+            osm_output.done()
+
+        if new_start_id != tile_node_start_id + tile_contours.nb_nodes:
+            logger.warning(
+                "new_start_id mismatch! new_start_id: %d - tile_node_start_id: %d",
+                new_start_id,
+                tile_node_start_id + tile_contours.nb_nodes,
+            )
+        if len(ways) != tile_contours.nb_ways:
+            logger.warning(
+                "tile_way_start_id mismatch! len(ways): %d - tile_way_start_id: %d",
+                len(ways),
+                tile_way_start_id,
+            )
 
-    def process_file(self, file_name: str, check_poly: bool) -> None:
-        """Process given file, parallelizing tiles processing if enabled.
+    def process_tile_internal(self, file_name: str, tile: HgtTile) -> None:
+        """Process a single output tile."""
+        logger.debug("process_tile %s", tile)
+        tile_contours = self.get_tile_contours(tile)
+        if tile_contours is not None:
+            self.write_tile(file_name, tile.bbox(), tile_contours)
+
+    def load_tiles(self, file_name: str, check_poly: bool) -> list[HgtTile]:
+        """Load given file and split it into tiles.
 
         Args:
             file_name (str): original file name
             check_poly (bool): whether polygons must be checked
-            options (_type_): processing options
         """
-        logger.debug("process_file %s", file_name)
         hgt_file = HgtFile(
             file_name,
             self.options.srtmCorrx,
@@ -241,28 +301,127 @@ class HgtFilesProcessor:
         )
         hgt_tiles = hgt_file.make_tiles(self.options)
         logger.debug("Tiles built; nb tiles: %d", len(hgt_tiles))
-        for tile in hgt_tiles:
-            logger.debug("  %s", tile.get_stats())
+        if logger.isEnabledFor(logging.DEBUG):
+            # Don't compute stats (and transform bboxes) if they're not logged
+            for tile in hgt_tiles:
+                logger.debug("  %s", tile.get_stats())
+        return hgt_tiles
+
+    def process_file(self, file_name: str, check_poly: bool) -> None:
+        """Process all tiles of given file in current process.
 
-        for tile in hgt_tiles:
-            self.try_parallelizing(self.process_tile_internal, file_name, tile)
+        Args:
+            file_name (str): original file name
+            check_poly (bool): whether polygons must be checked
+        """
+        logger.debug("process_file %s", file_name)
+        for tile in self.load_tiles(file_name, check_poly):
+            self.process_tile_internal(file_name, tile)
         logger.debug("Done with process_file %s", file_name)
 
-    def join_children(self, skip_active=False) -> None:
+    def open_common_output(self, files: list[tuple[str, bool]]) -> None:
+        """Initialize common OSM output, in single output mode.
+
+        Args:
+            files (List[Tuple[str, bool]]): List of [source file name, check poly toggle]
         """
-        Join all/finished children.
-        Call regularly to avoid open file (pipes) exhaustion when spawning
-        many processes for big datasets.
+        if not self.options.area:
+            raise ValueError("self.options.area is not defined")
+        self.get_osm_output(
+            [file_tuple[0] for file_tuple in files],
+            cast(
+                BBox,
+                [float(b) for b in self.options.area.split(":")],
+            ),
+        )
+
+    def iter_tiles(
+        self, files: list[tuple[str, bool]]
+    ) -> Iterator[tuple[str, HgtTile]]:
+        """Lazily load files and yield their tiles, to be dispatched to the workers pool.
+
+        Args:
+            files (List[Tuple[str, bool]]): List of [source file name, check poly toggle]
         """
-        for p in self.active_children:
-            if skip_active and p.is_alive():
+        for file_name, check_poly in files:
+            logger.debug("Loading tiles of %s", file_name)
+            try:
+                hgt_tiles = self.load_tiles(file_name, check_poly)
+            except Exception as e:
+                logger.exception("Exception caught while loading %s: %s", file_name, e)
+                self.children_errors.append(file_name)
                 continue
-            # Wait for child to finish and check return code
-            p.join()
-            logger.debug("Joined child process %d", p.pid)
-            if p.exitcode and p.pid:
-                self.children_errors.append((p.pid, p.exitcode))
-            self.active_children.remove(p)
+            # Dispatch biggest tiles first, to avoid a long tile being processed
+            # alone at the end while other workers are idle
+            hgt_tiles.sort(key=lambda tile: tile.estimated_nb_nodes, reverse=True)
+            for tile in hgt_tiles:
+                yield file_name, tile
+
+    def process_files_in_pool(self, files: list[tuple[str, bool]]) -> None:
+        """Process tiles of all files in a pool of worker processes.
+
+        Args:
+            files (List[Tuple[str, bool]]): List of [source file name, check poly toggle]
+        """
+        worker = _compute_tile_worker if self.single_output else _process_tile_worker
+        # Tiles sent to the workers and not processed yet; tiles data are sent via
+        # shared memory, and their number is explicitly limited to bound memory usage.
+        pending_tiles: dict[Future, SharedHgtTile] = {}
+
+        def handle_results(return_when: str) -> None:
+            done, _ = wait(pending_tiles, return_when=return_when)
+            for future in done:
+                try:
+                    result = future.result()
+                except BrokenProcessPool:
+                    # A worker was killed (eg. out of memory or crash in a native
+                    # library): the pool can't be used anymore
+                    logger.error(
+                        "A worker process terminated abruptly while processing tile(s):%s",
+                        "".join(f"\n - {tile}" for tile in pending_tiles.values()),
+                    )
+                    raise
+                # Tile's shared memory block has been released by the worker
+                del pending_tiles[future]
+                if isinstance(result, str):
+                    self.children_errors.append(result)
+                elif result is not None:
+                    # Single output mode: the output is owned by the current process,
+                    # writing sequentially contours computed by the workers
+                    self.write_tile(*result)
+
+        # Shared memory blocks are created by the parent and released by the workers;
+        # they must all rely on the same resource tracker process.
+        resource_tracker.ensure_running()
+        # Ensure "fork" method is used to share parent's process context (processor
+        # and its shared counters) with the workers
+        ctx = multiprocessing.get_context("fork")  # TODO: Windows compatibility
+        executor = ProcessPoolExecutor(
+            self.nb_jobs, mp_context=ctx, initializer=_init_worker, initargs=(self,)
+        )
+        try:
+            # Files are loaded while workers already process previous tiles
+            for file_name, tile in self.iter_tiles(files):
+                if len(pending_tiles) >= 2 * self.nb_jobs:
+                    handle_results(FIRST_COMPLETED)
+                shared_tile = SharedHgtTile(tile)
+                pending_tiles[executor.submit(worker, (file_name, shared_tile))] = (
+                    shared_tile
+                )
+                if self.single_output and self.common_osm_output is None:
+                    # Output is only opened once workers are forked (on first
+                    # submission), so that they don't inherit its writer thread,
+                    # compressor pipe or file handles
+                    self.open_common_output(files)
+            if pending_tiles:
+                handle_results(ALL_COMPLETED)
+        finally:
+            # Let workers exit gracefully, dropping tiles not started yet (on error)
+            executor.shutdown(wait=True, cancel_futures=True)
+            # Once the pool is stopped, release blocks of the tiles which weren't
+            # processed (eg. on error or interruption)
+            for shared_tile in pending_tiles.values():
+                SharedHgtTile.release_block(shared_tile.name)
 
     def process_files(self, files: list[tuple[str, bool]]) -> None:
         """Main entry point of this class, processing a bunch of HGT files.
@@ -270,63 +429,18 @@ class HgtFilesProcessor:
         Args:
             files (List[Tuple[str, bool]]): List of [source file name, check poly toggle]
         """
-        if self.single_output:
-            # Initialize common OSM output
-            if not self.options.area:
-                raise ValueError("self.options.area is not defined")
-            self.get_osm_output(
-                [file_tuple[0] for file_tuple in files],
-                cast(
-                    BBox,
-                    [float(b) for b in self.options.area.split(":")],
-                ),
-            )
-
-        # import objgraph
-        # import tracemalloc
-        # import random
+        if self.parallel:
+            self.process_files_in_pool(files)
+        else:
+            if self.single_output:
+                self.open_common_output(files)
+            for file_name, check_poly in files:
+                self.process_file(file_name, check_poly)
 
-        # tracemalloc.start(10)
-        for file_name, check_poly in files:
-            self.try_parallelizing(self.process_file, file_name, check_poly)
-            # snapshot = tracemalloc.take_snapshot()
-            # top_stats = snapshot.statistics("traceback")
-            # # logger.debug("[memory top 10]\n  "+"\n  ".join([str(s) for s in top_stats[:10]]))
-            # logger.debug("===== Memory usage =====")
-            # for stat in top_stats[:10]:
-            #     logger.debug(
-            #         "%s memory blocks: %.1f KiB" % (stat.count, stat.size / 1024)
-            #     )
-            #     logger.debug("\n ".join(stat.traceback.format()))
-
-            # logger.debug("nb files: %s; nb tiles: %s", objgraph.count("hgtFile"), objgraph.count("hgtTile"))
-            # tiles = objgraph.by_type("hgtTile")
-            # objgraph.show_backrefs(tiles, filename="tiles_refs.png")
-            # objgraph.show_most_common_types()
-            # objgraph.show_growth(limit=3)
-            # try:
-            #     objgraph.show_chain(
-            #         objgraph.find_backref_chain(
-            #             random.choice(objgraph.by_type("WayType")),
-            #             objgraph.is_proper_module,
-            #         ),
-            #         filename="chain.png",
-            #     )
-            # except Exception:
-            #     pass
-            # roots = objgraph.get_leaking_objects()
-            # logger.debug("Leaking objects: %s", objgraph.show_most_common_types(objects=roots))
-            # objgraph.show_refs(roots[:3], refcounts=True, filename='roots.png')
-            # # objgraph.show_refs([y], filename='sample-graph.png')
-        logger.debug("Done scheduling, waiting for all children to complete...")
-
-        self.join_children()
         if self.children_errors:
             logger.error(
-                "Some child process(es) finished with error; check earlier logs for exception details.%s",
-                "\n - ".join(
-                    f"pid: {p[0]}; exitcode: {p[1]}" for p in self.children_errors
-                ),
+                "Some tile(s) processing finished with error; check earlier logs for exception details.%s",
+                "".join(f"\n - {error}" for error in self.children_errors),
             )
 
         if self.single_output and self.common_osm_output is not None:
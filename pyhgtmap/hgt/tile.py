@@ -2,6 +2,7 @@ from __future__ import annotations
 
 import logging
 from functools import lru_cache
+from multiprocessing.shared_memory import SharedMemory
 from typing import TYPE_CHECKING, NamedTuple
 
 import numpy
@@ -41,9 +42,12 @@ class HgtTile:
         polygons: PolygonsList | None,
         mask,
         transform: TransformFunType | None,
+        estimated_nb_nodes: int = 0,
     ):
         """initializes tile-specific variables. The minimum elevation is stored in
         self.minEle, the maximum elevation in self.maxEle.
+        <estimated_nb_nodes> is the number of nodes estimated when chopping the tile,
+        if any.
         """
         self.minLon, self.minLat, self.maxLon, self.maxLat = bbox
         self.zData = data
@@ -54,6 +58,8 @@ class HgtTile:
         self.polygons = polygons
         self.mask = mask
         self.transform = transform
+        self.estimated_nb_nodes: int = estimated_nb_nodes
+        self.transformedBBox: BBox | None = None
         self.xData = numpy.arange(self.numOfCols) * self.lonIncrement + self.minLon
         self.yData = numpy.arange(self.numOfRows) * self.latIncrement * -1 + self.maxLat
         self.minEle, self.maxEle = self.getElevRange()
@@ -63,6 +69,17 @@ class HgtTile:
         # https://stackoverflow.com/a/68550238
         self.get_contours = lru_cache(maxsize=16)(self._get_contours)
 
+    def __getstate__(self) -> dict:
+        # The per-instance cache can't be pickled (eg. to send the tile to a worker
+        # process); it's rebuilt when unpickling.
+        state = self.__dict__.copy()
+        del state["get_contours"]
+        return state
+
+    def __setstate__(self, state: dict) -> None:
+        self.__dict__.update(state)
+        self.get_contours = lru_cache(maxsize=16)(self._get_contours)
+
     def get_stats(self) -> str:
         """Get some statistics about the tile."""
         minLon, minLat, maxLon, maxLat = self.bbox()
@@ -91,38 +108,38 @@ class HgtTile:
         maxEle = int(self.zData.max())
         return minEle, maxEle
 
+    def is_constant(self) -> bool:
+        """returns True if all the (non void) points of the tile have the same elevation,
+        in which case there's no contour line to generate.
+        """
+        return self.minEle == self.maxEle
+
     def bbox(self, doTransform=True) -> BBox:
         """returns the bounding box of the current tile."""
         if doTransform:
-            return transform_lon_lats(
-                self.minLon,
-                self.minLat,
-                self.maxLon,
-                self.maxLat,
-                self.transform,
-            )
+            # Transformed bbox is computed only once, as it's needed several times
+            # (stats, output file name and header...)
+            if self.transformedBBox is None:
+                self.transformedBBox = transform_lon_lats(
+                    self.minLon,
+                    self.minLat,
+                    self.maxLon,
+                    self.maxLat,
+                    self.transform,
+                )
+            return self.transformedBBox
         else:
             return BBox(self.minLon, self.minLat, self.maxLon, self.maxLat)
 
-    def contourLines(
+    def contour_levels(
         self,
         stepCont=20,
-        maxNodesPerWay=0,
         noZero=False,
         minCont=None,
         maxCont=None,
-        rdpEpsilon=None,
-    ) -> tuple[Iterable[int], ContoursGenerator]:
-        """generates contour lines using matplotlib.
-
-        <stepCont> is height difference of contiguous contour lines in meters
-        <maxNodesPerWay>:  the maximum number of nodes contained in each way
-        <noZero>:  if True, the 0 m contour line is discarded
-        <minCont>:  lower limit of the range to generate contour lines for
-        <maxCont>:  upper limit of the range to generate contour lines for
-        <rdpEpsilon>: epsilon to use in RDP contour line simplification
-
-        A list of elevations and a ContourObject is returned.
+    ) -> Iterable[int]:
+        """returns the elevations of the contour lines to generate for this tile,
+        within its elevation range. See contourLines() for parameters.
         """
 
         def getContLimit(ele: int, step: int) -> int:
@@ -145,6 +162,29 @@ class HgtTile:
             ]
         else:
             levels = range(int(min_cont), int(max_cont), stepCont)
+        return levels
+
+    def contourLines(
+        self,
+        stepCont=20,
+        maxNodesPerWay=0,
+        noZero=False,
+        minCont=None,
+        maxCont=None,
+        rdpEpsilon=None,
+    ) -> tuple[Iterable[int], ContoursGenerator]:
+        """generates contour lines using matplotlib.
+
+        <stepCont> is height difference of contiguous contour lines in meters
+        <maxNodesPerWay>:  the maximum number of nodes contained in each way
+        <noZero>:  if True, the 0 m contour line is discarded
+        <minCont>:  lower limit of the range to generate contour lines for
+        <maxCont>:  upper limit of the range to generate contour lines for
+        <rdpEpsilon>: epsilon to use in RDP contour line simplification
+
+        A list of elevations and a ContourObject is returned.
+        """
+        levels = self.contour_levels(stepCont, noZero, minCont, maxCont)
         x, y = numpy.meshgrid(self.xData, self.yData)
         # z data is a masked array filled with nan.
         z: numpy.typing.ArrayLike = numpy.ma.array(
@@ -206,6 +246,10 @@ class HgtTile:
         Returns:
             TileContours: List of contours coordinates, per elevation, and associates statistics
         """
+        if not self.contour_levels(step_cont, no_zero, min_cont, max_cont):
+            # No contour line within the tile's elevation range; don't bother building
+            # the contours generator
+            return TileContours(0, 0, {})
         elevations, contour_data = self.contourLines(
             step_cont,
             max_nodes_per_way,
@@ -223,3 +267,83 @@ class HgtTile:
 
         tile_contours = TileContours(total_nodes, total_ways, contours_per_elev)
         return tile_contours
+
+
+class SharedHgtTile:
+    """Handle on a tile which elevation data is moved to shared memory, so that
+    sending it to a worker process only serializes the shared memory block name
+    instead of the whole data.
+
+    The shared memory block is released by get_tile(), which must be called once, or
+    by release_block() if the tile is never loaded.
+    """
+
+    def __init__(self, tile: HgtTile) -> None:
+        data = numpy.ma.getdata(tile.zData)
+        self.shape: tuple[int, ...] = data.shape
+        self.dtype: numpy.dtype = data.dtype
+        self.fill_value = tile.zData.fill_value
+        self.description: str = str(tile)
+        self.shm = SharedMemory(create=True, size=data.nbytes + data.size)
+        data_view, mask_view = self._views()
+        data_view[:] = data
+        mask_view[:] = numpy.ma.getmaskarray(tile.zData)
+        del data_view, mask_view
+        # Everything but the elevation data is pickled along
+        self.tile_state: dict = tile.__getstate__()
+        self.tile_state["zData"] = None
+
+    def __getstate__(self) -> dict:
+        state = self.__dict__.copy()
+        state["shm"] = self.shm.name
+        return state
+
+    def __setstate__(self, state: dict) -> None:
+        self.__dict__.update(state)
+        self.shm = SharedMemory(name=state["shm"])
+
+    def __str__(self) -> str:
+        return self.description
+
+    @property
+    def name(self) -> str:
+        """Name of the shared memory block."""
+        return self.shm.name
+
+    @staticmethod
+    def release_block(name: str) -> None:
+        """Release a shared memory block by its name, if not already done by
+        get_tile() (eg. when the tile was never loaded by a worker)."""
+        try:
+            shm = SharedMemory(name=name)
+        except FileNotFoundError:
+            return
+        shm.close()
+        shm.unlink()
+
+    def _views(self) -> tuple[numpy.ndarray, numpy.ndarray]:
+        """Elevation data and mask arrays, mapped on the shared memory block."""
+        data_view: numpy.ndarray = numpy.ndarray(
+            self.shape, dtype=self.dtype, buffer=self.shm.buf
+        )
+        mask_view: numpy.ndarray = numpy.ndarray(
+            self.shape,
+            dtype=numpy.bool_,
+            buffer=self.shm.buf,
+            offset=data_view.nbytes,
+        )
+        return data_view, mask_view
+
+    def get_tile(self) -> HgtTile:
+        """Rebuild the tile from shared memory, and release the shared memory block."""
+        data_view, mask_view = self._views()
+        tile = HgtTile.__new__(HgtTile)
+        tile.__setstate__(self.tile_state)
+        # Copy data out of the block, so that it can be released right away
+        tile.zData = numpy.ma.array(
+            data_view.copy(), mask=mask_view.copy(), fill_value=self.fill_value
+        )
+        del data_view, mask_view
+        self.shm.close()
+        self.shm.unlink()
+        return tile
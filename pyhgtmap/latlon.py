@@ -1,17 +1,30 @@
 from __future__ import annotations
 
-import re
-
-DMS_REGEX = re.compile(
-    r"(?P<lat_flag>[NS])(?P<lat_deg>[0-9]{2,3})(?P<lon_flag>[EW])(?P<lon_deg>[0-9]{3})"
-)
+from functools import lru_cache
 
 MULTIPLIER: dict[str, int] = {"N": 1, "S": -1, "E": 1, "W": -1}
 
+# Flags indexed by "is negative"
+LAT_FLAGS: tuple[str, str] = ("N", "S")
+LON_FLAGS: tuple[str, str] = ("E", "W")
+
+
+def _is_digits(value: str, length: int) -> bool:
+    """Return True if value is made of exactly <length> ASCII digits."""
+    return len(value) == length and value.isascii() and value.isdigit()
+
+
+@lru_cache(maxsize=4096)
+def _to_string(lat: int, lon: int, lat_padding: int) -> str:
+    """Cached implementation of DegreeLatLon.to_string()."""
+    return f"{LAT_FLAGS[lat < 0]:s}{abs(lat):0>{lat_padding}d}{LON_FLAGS[lon < 0]:s}{abs(lon):0>3d}"
+
 
 class DegreeLatLon:
     """Degree-precision latitude-longitude helper class."""
 
+    __slots__ = ("lat", "lon")
+
     def __init__(self, lat: int, lon: int):
         self.lat: int = lat
         self.lon: int = lon
@@ -26,9 +39,7 @@ class DegreeLatLon:
         Returns:
             str: The string representation of the latitude and longitude values.
         """
-        lon_flag = "W" if self.lon < 0 else "E"
-        lat_flag = "S" if self.lat < 0 else "N"
-        return f"{lat_flag:s}{abs(self.lat):0>{lat_padding}d}{lon_flag:s}{abs(self.lon):0>3d}"
+        return _to_string(self.lat, self.lon, lat_padding)
 
     def __str__(self):
         return self.to_string()
@@ -37,16 +48,26 @@ class DegreeLatLon:
     def from_string(cls, latlon: str) -> DegreeLatLon:
         """
         Creates a new DegreeLatLon object from a string representation (e.g. "N45W122").
+        Latitude may be written with 2 or 3 digits; any trailing characters are ignored.
         """
-        match = DMS_REGEX.match(latlon)
-        if not match:
+        # Fixed format: slicing is much cheaper than matching a regex
+        lon_flag_index: int = 3 if latlon[3:4] in ("E", "W") else 4
+        lat_flag: str = latlon[:1]
+        lat_digits: str = latlon[1:lon_flag_index]
+        lon_flag: str = latlon[lon_flag_index : lon_flag_index + 1]
+        lon_digits: str = latlon[lon_flag_index + 1 : lon_flag_index + 4]
+        if (
+            lat_flag not in ("N", "S")
+            or lon_flag not in ("E", "W")
+            or not _is_digits(lat_digits, lon_flag_index - 1)
+            or not _is_digits(lon_digits, 3)
+        ):
             raise ValueError(f"Invalid latlon string: {latlon:s}")
-        lat_flag: str = match.group(1)
-        lat_deg: int = int(match.group(2)) * MULTIPLIER[lat_flag]
-        lon_flag: str = match.group(3)
-        lon_deg: int = int(match.group(4)) * MULTIPLIER[lon_flag]
 
-        return cls(lat_deg, lon_deg)
+        return cls(
+            int(lat_digits) * MULTIPLIER[lat_flag],
+            int(lon_digits) * MULTIPLIER[lon_flag],
+        )
 
     def round_to(self, multiple: int) -> DegreeLatLon:
         """
@@ -7,19 +7,24 @@ import logging
 import os
 import sys
 
-from pyhgtmap import NASASRTMUtil
 from pyhgtmap.cli import parse_command_line
-from pyhgtmap.hgt.file import calc_hgt_area
-from pyhgtmap.hgt.processor import HgtFilesProcessor
 from pyhgtmap.logger import configure_logging
 
 logger = logging.getLogger(__name__)
 
+# Extensions of the source files which can be passed on the command line
+SOURCE_FILES_EXTENSIONS = frozenset((".hgt", ".tif", ".tiff", ".vrt"))
+
 
 def main_internal(sys_args: list[str]) -> None:
     opts, args = parse_command_line(sys_args)
     configure_logging(opts.logLevel)
 
+    # Imported only when actually processing, to keep --help and --version fast
+    from pyhgtmap import NASASRTMUtil
+    from pyhgtmap.hgt.file import calc_hgt_area
+    from pyhgtmap.hgt.processor import HgtFilesProcessor
+
     hgtDataFiles: list[tuple[str, bool]]
     if args:
         # Prefer using any manually provided source file
@@ -27,13 +32,10 @@ def main_internal(sys_args: list[str]) -> None:
         hgtDataFiles = [
             (arg, use_poly_flag)
             for arg in args
-            if os.path.splitext(arg)[1].lower() in (".hgt", ".tif", ".tiff", ".vrt")
+            if os.path.splitext(arg)[1].lower() in SOURCE_FILES_EXTENSIONS
         ]
         opts.area = ":".join(
-            [
-                str(i)
-                for i in calc_hgt_area(hgtDataFiles, opts.srtmCorrx, opts.srtmCorry)
-            ],
+            map(str, calc_hgt_area(hgtDataFiles, opts.srtmCorrx, opts.srtmCorry)),
         )
     else:
         # Download from area or polygon
@@ -4,9 +4,14 @@ import logging
 from typing import TYPE_CHECKING, Any, Callable, NamedTuple
 
 import numpy
-from nptyping import NDArray, Structure
+
+from pyhgtmap.hgt.contour import is_closed_path
 
 if TYPE_CHECKING:
+    from collections.abc import Sequence
+
+    from nptyping import Int32, NDArray, Shape, Structure
+
     from pyhgtmap.hgt.tile import TileContours
 
 logger = logging.getLogger(__name__)
@@ -23,25 +28,38 @@ class WayType(NamedTuple):
 class EfficientWayType(NamedTuple):
     # More efficient alternative, relying on numpy
     first_node_id: numpy.uint64
-    nb_nodes: numpy.uint64
+    nb_nodes: numpy.uint32
     closed_loop: bool
-    elevation: numpy.uint64
-
-
-# Efficient representation of many ways (array of 4-tuple, similar to a list of WayType)
-WaysType = NDArray[
-    Any,
-    Structure["first_node_id: Int, nb_nodes: Int, closed_loop: Bool, elevation: Int"],
-]
-EfficientWaysType = NDArray[
-    Any,
-    Structure[
-        "first_node_id: UInt64, nb_nodes: UInt64, closed_loop: Bool, elevation: UInt64"
-    ],
-]
+    elevation: numpy.int32
 
 
-NodeType = tuple[int, int]
+# Arrays types are only needed for type checking; nptyping isn't imported at runtime
+if TYPE_CHECKING:
+    # Efficient representation of many ways (array of 4-tuple, similar to a list of WayType)
+    WaysType = NDArray[
+        Any,
+        Structure[
+            "first_node_id: Int, nb_nodes: Int, closed_loop: Bool, elevation: Int"
+        ],
+    ]
+    EfficientWaysType = NDArray[
+        Any,
+        Structure[
+            "first_node_id: UInt64, nb_nodes: UInt32, closed_loop: Bool, elevation: Int32"
+        ],
+    ]
+    # Coordinates of many nodes, as (lon, lat) integers scaled by the output's precision
+    NodesType = NDArray[Shape["*, 2"], Int32]
+
+# Actual numpy type of EfficientWaysType arrays
+WAY_DTYPE = numpy.dtype(
+    [
+        ("first_node_id", numpy.uint64),
+        ("nb_nodes", numpy.uint32),
+        ("closed_loop", bool),
+        ("elevation", numpy.int32),
+    ],
+)
 
 
 def make_elev_classifier(majorDivisor: int, mediumDivisor: int) -> Callable[[int], str]:
@@ -93,10 +111,11 @@ class Output:
 
     def done(self) -> None:
         """Finalize and close file."""
-        logger.debug(
-            "done() - Writing %s pending ways",
-            sum(len(x[0]) for x in self.ways_pending_write),
-        )
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug(
+                "done() - Writing %s pending ways",
+                sum(len(x[0]) for x in self.ways_pending_write),
+            )
         for ways, start_way_id in self.ways_pending_write:
             self._write_ways(ways, start_way_id)
         logger.debug("done() - done!")
@@ -119,20 +138,31 @@ class Id:
         self.curId += 1
         return self.curId - 1
 
+    def reserve(self, count: int) -> int:
+        """Reserve <count> consecutive IDs at once, returning the first one."""
+        startId = self.curId
+        self.curId += count
+        return startId
+
 
 # Helper functions
-def _makePoints(path, IDCounter, precision: int) -> tuple[list[NodeType], list[int]]:
-    ids, nodes = [], []
-    for lon, lat in path:
-        IDCounter.curId += 1
-        nodes.append((int(lon * precision), int(lat * precision)))
-        ids.append(IDCounter.curId - 1)
-    if numpy.all(path[0] == path[-1]):  # close contour
-        del nodes[-1]  # remove last node
-        del ids[-1]
-        ids.append(ids[0])
-        IDCounter.curId -= 1
-    return nodes, ids
+def make_ways(
+    start_node_id: int,
+    nb_nodes: Sequence[int],
+    closed_loops: Sequence[bool],
+    elevations: int | Sequence[int],
+) -> EfficientWaysType:
+    """Build the ways of consecutive paths, which nodes IDs are allocated
+    contiguously from <start_node_id>. Fields are filled column by column.
+    """
+    ways = numpy.empty(len(nb_nodes), dtype=WAY_DTYPE)
+    ways["nb_nodes"] = nb_nodes
+    ways["first_node_id"] = numpy.cumsum(ways["nb_nodes"], dtype=numpy.uint64)
+    ways["first_node_id"] += start_node_id
+    ways["first_node_id"] -= ways["nb_nodes"]
+    ways["closed_loop"] = closed_loops
+    ways["elevation"] = elevations
+    return ways  # type: ignore[return-value]
 
 
 def make_nodes_ways(
@@ -140,29 +170,21 @@ def make_nodes_ways(
     elevation: int,
     IDCounter,
     precision: int,
-) -> tuple[list, list[WayType]]:
-    ways: list[WayType] = []
-    nodes: list = []
-    for path in contourList:
-        newNodes, nodeRefs = _makePoints(path, IDCounter, precision)
-        nodes.extend(newNodes)
-        if nodeRefs[0] == nodeRefs[-1]:
-            ways.append(WayType(nodeRefs[0], len(nodeRefs) - 1, True, elevation))
-        else:
-            ways.append(WayType(nodeRefs[0], len(nodeRefs), False, elevation))
-    return nodes, ways
+) -> tuple[NodesType, EfficientWaysType]:
+    """returns the nodes of all the paths in <contourList>, as a single array of
+    (lon, lat) coordinates multiplied by <precision>, and the corresponding ways.
 
-
-def build_efficient_ways(ways: list[WayType]) -> EfficientWaysType:
-    """Convert a list of ways (tuples) into a more efficient numpy array."""
-    return numpy.array(
-        ways,
-        dtype=numpy.dtype(
-            [
-                ("first_node_id", numpy.uint64),
-                ("nb_nodes", numpy.uint64),
-                ("closed_loop", bool),
-                ("elevation", numpy.uint64),
-            ],
-        ),
-    )  # type: ignore[reportGeneralTypeIssues]  # not supported by pylance
+    The last node of closed paths isn't repeated, the way re-using the first one.
+    """
+    closedLoops = [is_closed_path(path) for path in contourList]
+    nbNodes = [len(path) - closed for path, closed in zip(contourList, closedLoops)]
+    totalNodes = sum(nbNodes)
+    ways = make_ways(IDCounter.reserve(totalNodes), nbNodes, closedLoops, elevation)
+    # lon * precision fits in 32 bits for a precision up to 1e7
+    nodes = numpy.empty((totalNodes, 2), dtype=numpy.int32)
+    offset = 0
+    for path, length in zip(contourList, nbNodes):
+        # Coordinates are truncated towards 0 by the assignment
+        nodes[offset : offset + length] = path[:length] * precision
+        offset += length
+    return nodes, ways
@@ -1,7 +1,8 @@
 from __future__ import annotations
 
 import os
-from typing import TYPE_CHECKING, Any
+from functools import cache
+from typing import TYPE_CHECKING, Any, Callable
 
 import pyhgtmap
 import pyhgtmap.output
@@ -14,6 +15,11 @@ if TYPE_CHECKING:
     from pyhgtmap import BBox
     from pyhgtmap.configuration import Configuration
 
+# Sources directories which files are named after their data source
+KNOWN_SOURCES_PREFIXES = frozenset(
+    ("srtm1", "srtm3", "view1", "view3", "sonn1", "sonn3")
+)
+
 
 def make_osm_filename(
     borders: BBox,
@@ -25,34 +31,26 @@ def make_osm_filename(
     """
 
     prefix = f"{opts.outputPrefix:s}_" if opts.outputPrefix else ""
-    srcNameMiddles = [
-        os.path.split(os.path.split(srcName)[0])[1].lower()
+    bboxString = hgt.makeBBoxString(borders).format(prefix)
+    srcNameMiddles = {
+        os.path.basename(os.path.dirname(srcName)).lower()
         for srcName in input_files_names
-    ]
-    for srcNameMiddle in set(srcNameMiddles):
-        if srcNameMiddle.lower()[:5] in [
-            "srtm1",
-            "srtm3",
-            "view1",
-            "view3",
-            "sonn1",
-            "sonn3",
-        ]:
+    }
+    for srcNameMiddle in srcNameMiddles:
+        if srcNameMiddle[:5] in KNOWN_SOURCES_PREFIXES:
             continue
         elif not opts.dataSource:
             # files from the command line, this could be something custom
-            srcTag = ",".join(set(srcNameMiddles))
-            # osmName = hgt.makeBBoxString(borders).format(prefix) + "_{0:s}.osm".format(srcTag)
-            osmName = hgt.makeBBoxString(borders).format(prefix) + "_local-source.osm"
+            osmName = bboxString + "_local-source.osm"
             break
         else:
-            osmName = hgt.makeBBoxString(borders).format(prefix) + ".osm"
+            osmName = bboxString + ".osm"
             break
     else:
         if not opts.dataSource:
             raise ValueError("opts.dataSource is not defined")
-        srcTag = ",".join([s for s in opts.dataSource if s in set(srcNameMiddles)])
-        osmName = hgt.makeBBoxString(borders).format(prefix) + f"_{srcTag:s}.osm"
+        srcTag = ",".join([s for s in opts.dataSource if s in srcNameMiddles])
+        osmName = bboxString + f"_{srcTag:s}.osm"
     if opts.gzip:
         osmName += ".gz"
     elif opts.pbf:
@@ -78,6 +76,16 @@ def makeBoundsString(bbox: Any) -> str:
     return f'<bounds minlat="{minlat:.7f}" minlon="{minlon:.7f}" maxlat="{maxlat:.7f}" maxlon="{maxlon:.7f}"/>'
 
 
+@cache
+def get_elev_classifier(line_cats: str) -> Callable[[int], str]:
+    """Return the elevation classifier matching the lineCats option, built only
+    once per process (and not for every output tile).
+    Elevations are few, so the classification of each one is cached as well."""
+    return cache(
+        make_elev_classifier(*[int(h) for h in line_cats.split(",")]),
+    )
+
+
 def get_osm_output(
     opts: Configuration,
     input_files_names: list[str],
@@ -85,7 +93,7 @@ def get_osm_output(
 ) -> Output:
     """Return the proper OSM Output generator."""
     outputFilename = make_osm_filename(bounds, opts, input_files_names)
-    elevClassifier = make_elev_classifier(*[int(h) for h in opts.lineCats.split(",")])
+    elevClassifier = get_elev_classifier(opts.lineCats)
     output: Output
     if opts.pbf:
         output = pbfUtil.Output(
@@ -114,5 +122,9 @@ def get_osm_output(
             gzip=opts.gzip,
             elevClassifier=elevClassifier,
             timestamp=opts.writeTimestamp,
+            # Only a single output is written at a time by the main process (without
+            # parallelization or in single output mode); otherwise each pool worker
+            # writes its own outputs, already compressing in parallel.
+            parallelGzip=opts.nJobs <= 1 or opts.maxNodesPerTile == 0,
         )
     return output
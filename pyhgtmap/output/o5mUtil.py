@@ -1,39 +1,97 @@
 from __future__ import annotations
 
-import ast
 import time
 from typing import TYPE_CHECKING, Callable
 
+import numpy
+
 import pyhgtmap.output
 from pyhgtmap import output
-from pyhgtmap.varint import int2str, join, sint2str, writableInt, writableString
+from pyhgtmap.varint import (
+    MAX_VARINT_LEN,
+    int2str,
+    int_array2str,
+    join,
+    sint2str,
+    sint_array2str,
+    writableInt,
+    writableString,
+)
 
 if TYPE_CHECKING:
     from pyhgtmap import BBox
     from pyhgtmap.hgt.tile import TileContours
 
 HUNDREDNANO = 10000000
+NODE_DATASET = writableInt(0x10)
+NODES_ENCODING_BATCH = 65536
+# Small writes (reset bytes, first node of each tile...) are grouped in this buffer
+WRITE_BUFFER_SIZE = 1024 * 1024
+STRING_SEPARATOR = writableInt(0x00)
+# contour = elevation string pair, common to all the ways
+CONTOUR_TAG = b"\x00contour\x00elevation\x00"
+WAY_DATASET = writableInt(0x11)
+# Nodes IDs of a way are consecutive, so most of its node references are +1 deltas
+NODE_REF_DELTA_ONE = sint2str(1)
+
+
+def encodeNodesDeltas(deltas: numpy.ndarray, nodeDataPrefix: bytes) -> bytes:
+    """returns the o5m datasets of nodes, which data is <nodeDataPrefix> followed by
+    the coordinates <deltas> (an array of (<deltaLon>, <deltaLat>) ints).
+
+    All the datasets are encoded at once, as rows of padded bytes which padding is
+    dropped at the end.
+    """
+    nbNodes = len(deltas)
+    deltaLons, deltaLonsLengths = sint_array2str(deltas[:, 0])
+    deltaLats, deltaLatsLengths = sint_array2str(deltas[:, 1])
+    nodeDataLengths, nodeDataLengthsLengths = int_array2str(
+        len(nodeDataPrefix) + deltaLonsLengths + deltaLatsLengths,
+    )
+    # 0x10 means node
+    nodeDataset = numpy.full((nbNodes, 1), NODE_DATASET[0], dtype=numpy.uint8)
+    prefix = numpy.tile(numpy.frombuffer(nodeDataPrefix, numpy.uint8), (nbNodes, 1))
+    padded = numpy.hstack(
+        (nodeDataset, nodeDataLengths, prefix, deltaLons, deltaLats),
+    )
+    varintBytes = numpy.arange(MAX_VARINT_LEN)
+    used = numpy.hstack(
+        (
+            numpy.ones_like(nodeDataset, dtype=bool),
+            varintBytes < nodeDataLengthsLengths[:, None],
+            numpy.ones_like(prefix, dtype=bool),
+            varintBytes < deltaLonsLengths[:, None],
+            varintBytes < deltaLatsLengths[:, None],
+        ),
+    )
+    return padded[used].tobytes()
 
 
 class StringTable:
     def __init__(self):
-        self.table = []
+        # Strings mapped to their insertion sequence number, oldest first
+        self.table: dict[bytes, int] = {}
+        self.seq = 0
         self.maxStringRef = 15000
 
     def stringOrIndex(self, string):
         if len(string) > 250:
             return string
-        if string not in self.table:
-            self.table.append(string)
+        stringSeq = self.table.get(string)
+        if stringSeq is None:
+            self.table[string] = self.seq
+            self.seq += 1
             if len(self.table) == self.maxStringRef + 1:
-                self.table.pop(0)
+                del self.table[next(iter(self.table))]
             return string
         else:
-            stringRef = len(self.table) - self.table.index(string)
+            # 1 for the latest inserted string
+            stringRef = self.seq - stringSeq
             return int2str(stringRef)
 
     def reset(self):
-        self.table = []
+        self.table = {}
+        self.seq = 0
 
 
 class Output(output.Output):
@@ -47,10 +105,14 @@ class Output(output.Output):
         writeTimestamp=False,
     ) -> None:
         super().__init__()
-        self.outf = open(filename, "wb")  # noqa: SIM115 # TODO: use context handler
+        self.outf = open(  # noqa: SIM115 # TODO: use context handler
+            filename, "wb", buffering=WRITE_BUFFER_SIZE
+        )
         self.bbox = bbox
         self.elevClassifier = elevClassifier
         self.stringTable = StringTable()
+        # Tags only depend on the elevation, shared by many ways: encode them once
+        self.elevationTags: dict[int, tuple[bytes, bytes, bytes]] = {}
         self.writeTimestamp = writeTimestamp
         self.timestamp = int(time.mktime(time.localtime()))
         self.timestampString = ""  # dummy attribute, needed by main.py
@@ -61,10 +123,10 @@ class Output(output.Output):
 
         <a> and <b> are two strings; <b> can be None.
         """
-        string = chr(0) + a + chr(0)
+        pair = STRING_SEPARATOR + writableString(a) + STRING_SEPARATOR
         if b is not None:
-            string += b + chr(0)
-        return writableString(string)
+            pair += writableString(b) + STRING_SEPARATOR
+        return pair
 
     def writeReset(self):
         self.outf.write(writableInt(0xFF))
@@ -127,22 +189,35 @@ class Output(output.Output):
         return join(data)
 
     def writeNodesO5m(self, nodes, startNodeId):
-        """writes nodes to self.outf.  nodeList shall be a list of
-        (<lon>, <lat>) duples of ints in nanodegrees of longitude and latitude,
-        respectively.
+        """writes nodes to self.outf.  nodes shall be an array of
+        (<lon>, <lat>) duples of ints in hundreds of nanodegrees of longitude and
+        latitude, respectively.
 
         The nodelist is split up to make sure the pbf blobs will not be too big.
         """
         if len(nodes) == 0:
             return
+        # 64 bits, as deltas between 32 bits coordinates may not fit in 32 bits
+        nodes = numpy.asarray(nodes, dtype=numpy.int64)
         # because this method is possibly used multiple times per output file,
         # reset the delta counters each time
         self.writeReset()
         # write the first node
-        self.writeNode(nodes[0], lastNode=None, idDelta=startNodeId)
-        # write all other nodes:
-        for ind, node in enumerate(nodes[1:]):
-            self.writeNode(node, lastNode=nodes[ind], idDelta=1)
+        self.writeNode(nodes[0].tolist(), lastNode=None, idDelta=startNodeId)
+        if len(nodes) == 1:
+            return
+        # all other nodes share the same ID delta and version information; only
+        # their coordinates deltas differ
+        nodeDataPrefix = sint2str(1) + self.makeVersionChunk(first=False)
+        deltas = numpy.diff(nodes, axis=0)
+        # encode by batches, to bound memory used by the padded encodings
+        for start in range(0, len(deltas), NODES_ENCODING_BATCH):
+            self.outf.write(
+                encodeNodesDeltas(
+                    deltas[start : start + NODES_ENCODING_BATCH],
+                    nodeDataPrefix,
+                ),
+            )
 
     def writeNode(self, node, lastNode, idDelta):
         nodeDataset = []
@@ -182,27 +257,28 @@ class Output(output.Output):
         """
         if len(ways) == 0:
             return
+        # Iterate over plain python values rather than numpy records
+        waysList: list[pyhgtmap.output.WayType] = ways.tolist()
         # write a reset byte
         self.writeReset()
-        # write the first way
-        self.writeWay(ways[0], idDelta=startWayId, first=True)
-        # write all other ways
-        for way in ways[1:]:
-            self.writeWay(way, idDelta=1)
-
-    def writeWay(
-        self, way: pyhgtmap.output.EfficientWayType, idDelta: int, first=False
-    ):
-        wayDataset = []
-        # 0x11 means way
-        wayDataset.append(writableInt(0x11))
+        # the first way, then all other ways, encoded in memory and written at once
+        wayDatasets = [
+            self.makeWayDataset(waysList[0], idDelta=startWayId, first=True),
+        ]
+        wayDatasets.extend(self.makeWayDataset(way, idDelta=1) for way in waysList[1:])
+        self.outf.write(join(wayDatasets))
+
+    def writeWay(self, way: pyhgtmap.output.WayType, idDelta: int, first=False):
+        self.outf.write(self.makeWayDataset(way, idDelta, first))
+
+    def makeWayDataset(
+        self, way: pyhgtmap.output.WayType, idDelta: int, first=False
+    ) -> bytes:
         wayData = self.makeWayData(way, idDelta, first)
-        wayDataLen = len(wayData)
-        wayDataset.append(int2str(wayDataLen))
-        wayDataset.append(wayData)
-        self.outf.write(join(wayDataset))
+        # 0x11 means way
+        return WAY_DATASET + int2str(len(wayData)) + wayData
 
-    def makeWayData(self, way: pyhgtmap.output.EfficientWayType, idDelta, first: bool):
+    def makeWayData(self, way: pyhgtmap.output.WayType, idDelta, first: bool):
         startNodeId, length, isCycle, elevation = way
         data = []
         data.append(sint2str(idDelta))
@@ -210,48 +286,35 @@ class Output(output.Output):
         data.append(self.makeVersionChunk(first))
 
         # node references
-        wayRefSection = self.makeWayReferenceSection(
-            startNodeId.item(), length.item(), isCycle
-        )
+        wayRefSection = self.makeWayReferenceSection(startNodeId, length, isCycle)
         wayRefSectionLen = len(wayRefSection)
         data.append(int2str(wayRefSectionLen))
         data.append(wayRefSection)
         # tags
-        # ele = <elevation>
-        eleTag = self.makeStringPair("ele", str(elevation))
-        contourTag = self.makeStringPair("contour", "elevation")
-        elevClassifierTag = self.makeStringPair(
-            "contour_ext",
-            self.elevClassifier(elevation.astype(int)),
-        )
-        data.append(self.stringTable.stringOrIndex(eleTag))
-        data.append(self.stringTable.stringOrIndex(contourTag))
-        data.append(self.stringTable.stringOrIndex(elevClassifierTag))
+        tags = self.elevationTags.get(elevation)
+        if tags is None:
+            tags = self.elevationTags[elevation] = (
+                # ele = <elevation>
+                self.makeStringPair("ele", str(elevation)),
+                CONTOUR_TAG,
+                self.makeStringPair("contour_ext", self.elevClassifier(elevation)),
+            )
+        data.extend(self.stringTable.stringOrIndex(tag) for tag in tags)
         return join(data)
 
     def makeWayReferenceSection(
         self, startNodeId: int, length: int, isCycle: bool
     ) -> bytes:
-        nodeIdDeltas: list[int] = []
-        # the first node id, delta coded
-        nodeIdDeltas.append(startNodeId - self.lastNodeId)
-        nodeIdDeltas.extend(
-            [
-                1,
-            ]
-            * (length - 1),
+        # the first node id, delta coded, then consecutive node ids
+        section = sint2str(startNodeId - self.lastNodeId) + NODE_REF_DELTA_ONE * (
+            length - 1
         )
         if isCycle:
-            nodeIdDeltas.append(-(length - 1))
+            section += sint2str(-(length - 1))
             self.lastNodeId = startNodeId
         else:
             self.lastNodeId = startNodeId + length - 1
-        return join([sint2str(nodeIdDelta) for nodeIdDelta in nodeIdDeltas])
-
-    def write(self, nodeString):
-        """wrapper imitating osmUtil.Output's write method."""
-        startNodeId, nodes = ast.literal_eval(nodeString.strip())
-        self.writeNodesO5m(nodes, startNodeId)
+        return section
 
     def flush(self) -> None:
         self.outf.flush()
@@ -281,8 +344,9 @@ def writeNodes(
     start_node_id,
 ) -> tuple[int, output.EfficientWaysType]:
     IDCounter = pyhgtmap.output.Id(start_node_id)
-    ways = []
-    nodes = []
+    ways: list[pyhgtmap.output.EfficientWaysType] = []
+    nodes: list[pyhgtmap.output.NodesType] = []
+    nbNodes = 0
     startId = start_node_id
     for elevation, contourList in tile_contours.contours.items():
         if not contourList:
@@ -293,15 +357,19 @@ def writeNodes(
             IDCounter,
             HUNDREDNANO,
         )
-        ways.extend(newWays)
-        nodes.extend(newNodes)
-        if len(nodes) > 32000:
-            output.write(str((startId, nodes)) + "\n")
+        ways.append(newWays)
+        nodes.append(newNodes)
+        nbNodes += len(newNodes)
+        if nbNodes > 32000:
+            output.writeNodesO5m(numpy.concatenate(nodes), startId)
             output.flush()
             startId = IDCounter.curId
             nodes = []
+            nbNodes = 0
     newId = IDCounter.getId()
-    if len(nodes) > 0:
-        output.write(str((startId, nodes)) + "\n")
+    if nbNodes > 0:
+        output.writeNodesO5m(numpy.concatenate(nodes), startId)
         output.flush()
-    return newId, pyhgtmap.output.build_efficient_ways(ways)
+    if not ways:
+        return newId, pyhgtmap.output.make_ways(start_node_id, [], [], [])
+    return newId, numpy.concatenate(ways)
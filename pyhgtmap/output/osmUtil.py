@@ -1,19 +1,27 @@
 from __future__ import annotations
 
 import datetime
+import io
+import queue
+import shutil
+import subprocess
+import threading
 import time
-from typing import TYPE_CHECKING, Callable
-
-import numpy
+from typing import TYPE_CHECKING, BinaryIO, Callable, cast
 
 import pyhgtmap.output
+from pyhgtmap.hgt.contour import is_closed_path
 from pyhgtmap.varint import writableString
 
 if TYPE_CHECKING:
-    from io import IOBase
-
     from pyhgtmap.hgt.tile import TileContours
 
+WRITE_BUFFER_SIZE: int = 128 * 1024
+# Reference to a node in a way, to be %-formatted with the node ID
+NODE_REF_TEMPLATE = b'<nd ref="%d"/>\n'
+# Maximum number of chunks waiting to be written by a BackgroundWriter
+MAX_PENDING_WRITES: int = 16
+
 
 def makeUtcTimestamp():
     return (
@@ -22,6 +30,53 @@ def makeUtcTimestamp():
     )
 
 
+class BackgroundWriter:
+    """Writes to a file from a background thread, so that slow writes (eg. gzip
+    compression, which releases the GIL) overlap with the formatting of the next
+    data. Errors of the background thread are raised by the next call.
+    """
+
+    def __init__(self, file: BinaryIO) -> None:
+        self.file = file
+        self.pending: queue.Queue[bytes | None] = queue.Queue(MAX_PENDING_WRITES)
+        self.error: BaseException | None = None
+        self.thread = threading.Thread(target=self._drain, daemon=True)
+        self.thread.start()
+
+    def _drain(self) -> None:
+        while True:
+            data = self.pending.get()
+            try:
+                if data is None:
+                    return
+                if self.error is None:
+                    self.file.write(data)
+            except BaseException as e:
+                self.error = e
+            finally:
+                self.pending.task_done()
+
+    def _raise_error(self) -> None:
+        if self.error is not None:
+            raise self.error
+
+    def write(self, data: bytes) -> None:
+        self._raise_error()
+        self.pending.put(data)
+
+    def flush(self) -> None:
+        self.pending.join()
+        self._raise_error()
+        self.file.flush()
+
+    def close(self) -> None:
+        if self.thread.is_alive():
+            self.pending.put(None)
+            self.thread.join()
+        self.file.close()
+        self._raise_error()
+
+
 class Output(pyhgtmap.output.Output):
     """An OSM output.
 
@@ -31,6 +86,10 @@ class Output(pyhgtmap.output.Output):
     the gzip compressionlevel (or 0 if no gzip compression is desired),
     an elevation classifying function as returned by makeElevClassifier()
     and a hint weather to write timestamps to output or not.
+
+    Gzip compression is delegated to pigz, compressing in parallel, when it's
+    installed and parallelGzip is set. It must be unset when outputs are written
+    concurrently by several processes, each pigz using all the CPUs otherwise.
     """
 
     def __init__(
@@ -42,15 +101,40 @@ class Output(pyhgtmap.output.Output):
         gzip: int,
         elevClassifier: Callable[[int], str],
         timestamp=False,
+        parallelGzip=True,
     ) -> None:
         super().__init__()
-        self.outF: IOBase
-        if 0 < gzip < 10:
+        self.outF: BinaryIO | BackgroundWriter
+        # External compression process, if any
+        self.compressor: subprocess.Popen | None = None
+        pigz = shutil.which("pigz") if parallelGzip and 0 < gzip < 10 else None
+        if pigz:
+            # Parallel compression, in a separate process
+            with open(fName, "wb") as outFile:
+                # Fixed command line, pigz path resolved by shutil.which()
+                self.compressor = subprocess.Popen(  # noqa: S603
+                    [pigz, f"-{gzip:d}", "-c"],
+                    stdin=subprocess.PIPE,
+                    stdout=outFile,
+                    bufsize=WRITE_BUFFER_SIZE,
+                )
+            self.outF = cast("BinaryIO", self.compressor.stdin)
+        elif 0 < gzip < 10:
             import gzip as Gzip
 
-            self.outF = Gzip.open(fName, "wb", gzip)
+            # GzipFile doesn't buffer writes by itself: group small writes before
+            # compressing them. Compression happens in the background, while next
+            # tiles are being formatted.
+            self.outF = BackgroundWriter(
+                io.BufferedWriter(
+                    Gzip.open(fName, "wb", gzip),  # type: ignore[arg-type]
+                    buffer_size=WRITE_BUFFER_SIZE,
+                ),
+            )
         else:
-            self.outF = open(fName, "wb")  # noqa: SIM115 # TODO: use context handler
+            self.outF = open(  # noqa: SIM115 # TODO: use context handler
+                fName, "wb", buffering=WRITE_BUFFER_SIZE
+            )
         self.osmVersion = f"{osmVersion:.1f}"
         if osmVersion > 0.5:
             self.versionString = ' version="1"'
@@ -76,28 +160,48 @@ class Output(pyhgtmap.output.Output):
         super().done()
         self.write("</osm>\n")
         self.outF.close()
+        if self.compressor is not None and self.compressor.wait() != 0:
+            raise OSError(
+                f"compression failed with exit code {self.compressor.returncode:d}",
+            )
 
-    def write(self, output):
-        self.outF.write(writableString(output))
+    def write(self, output: str | bytes) -> None:
+        if isinstance(output, str):
+            output = writableString(output)
+        self.outF.write(output)
 
     def flush(self) -> None:
         self.outF.flush()
 
     def _write_ways(self, ways: pyhgtmap.output.EfficientWaysType, startWayId):
-        IDCounter = pyhgtmap.output.Id(startWayId)
-        for startNodeId, length, isCycle, elevation in ways:
-            IDCounter.curId += 1
+        content = []
+        # Ways are formatted as bytes, like nodes
+        wayTemplate = writableString(
+            f'<way id="%d"{self.versionString:s}{self.timestampString:s}>%b%b',
+        )
+        # Tags only depend on the elevation, shared by many ways: format them only
+        # once per elevation
+        tagsPerElevation: dict[int, bytes] = {}
+        # Iterate over plain python values rather than numpy records
+        for wayId, (startNodeId, length, isCycle, elevation) in enumerate(
+            ways.tolist(),
+            startWayId,
+        ):
             nodeIds = list(range(startNodeId, startNodeId + length))
             if isCycle:
                 nodeIds.append(nodeIds[0])
-            nodeRefs = ('<nd ref="{:d}"/>\n' * len(nodeIds)).format(*nodeIds)
-            self.write(
-                f'<way id="{IDCounter.curId - 1:d}"{self.versionString:s}{self.timestampString:s}>{nodeRefs:s}'
-                f'<tag k="ele" v="{elevation:d}"/>'
-                '<tag k="contour" v="elevation"/>'
-                f'<tag k="contour_ext" v="{self.elevClassifier(elevation):s}"/>'
-                "</way>\n",
-            )
+            nodeRefs = (NODE_REF_TEMPLATE * len(nodeIds)) % tuple(nodeIds)
+            tags = tagsPerElevation.get(elevation)
+            if tags is None:
+                tags = tagsPerElevation[elevation] = writableString(
+                    f'<tag k="ele" v="{elevation:d}"/>'
+                    '<tag k="contour" v="elevation"/>'
+                    f'<tag k="contour_ext" v="{self.elevClassifier(elevation):s}"/>'
+                    "</way>\n",
+                )
+            content.append(wayTemplate % (wayId, nodeRefs, tags))
+        # Ways are written all at once
+        self.write(b"".join(content))
 
     def write_nodes(
         self,
@@ -115,49 +219,57 @@ class Output(pyhgtmap.output.Output):
         )
 
 
-def _makePoints(output, path, IDCounter, versionString, timestampString):
+def makeNodeTemplate(versionString: str, timestampString: str) -> bytes:
+    """returns the template of OSM XML nodes, to be %-formatted with the node's
+    (<id>, <lat>, <lon>).
+
+    Formatting bytes directly is faster than formatting a string and encoding it.
+    """
+    return writableString(
+        f'<node id="%d" lat="%.7f" lon="%.7f"{versionString:s}{timestampString:s}/>\n',
+    )
+
+
+def _makePoints(output, path, IDCounter, nodeTemplate: bytes):
     """writes OSM representations of the points making up a path to
-    output.
+    output, formatted with <nodeTemplate> (see makeNodeTemplate()).
 
     It returns a list of the node ids included in this path.
     """
-    ids, content = [], []
-    for lon, lat in path:
-        IDCounter.curId += 1
-        content.append(
-            f'<node id="{IDCounter.curId - 1:d}" lat="{lat:.7f}" lon="{lon:.7f}"{versionString:s}{timestampString:s}/>',
-        )
-        ids.append(IDCounter.curId - 1)
-    if numpy.all(path[0] == path[-1]):  # close contour
-        del content[-1]  # remove last node
-        del ids[-1]
+    closed = is_closed_path(path)
+    if closed:
+        # close contour by re-using the first node; last node is not written
+        path = path[:-1]
+    startId = IDCounter.reserve(len(path))
+    ids = list(range(startId, startId + len(path)))
+    # Format all the nodes at once, from plain python floats rather than numpy scalars
+    content = b"".join(
+        map(nodeTemplate.__mod__, zip(ids, path[:, 1].tolist(), path[:, 0].tolist())),
+    )
+    if closed:
         ids.append(ids[0])
-        IDCounter.curId -= 1
-    # output is eventually a pipe, so we must pass a string
-    output.write("\n".join(content) + "\n")
+    output.write(content)
     return ids
 
 
 def _writeContourNodes(
     output,
     contourList,
-    elevation,
     IDCounter,
-    versionString,
-    timestampString,
-):
+    nodeTemplate: bytes,
+) -> tuple[list[int], list[bool]]:
     """calls _makePoints() to write nodes to <output> and collects information
-    about the paths in contourList, namely the node ids for each path, which is
-    the returned.
+    about the paths in contourList, namely the number of nodes of each path and
+    whether it's closed, which are returned.
     """
-    ways = []
+    nbNodes = []
+    closedLoops = []
     for path in contourList:
-        nodeRefs = _makePoints(output, path, IDCounter, versionString, timestampString)
-        if nodeRefs[0] == nodeRefs[-1]:
-            ways.append((nodeRefs[0], len(nodeRefs) - 1, True, elevation))
-        else:
-            ways.append((nodeRefs[0], len(nodeRefs), False, elevation))
-    return ways
+        nodeRefs = _makePoints(output, path, IDCounter, nodeTemplate)
+        closed = nodeRefs[0] == nodeRefs[-1]
+        nbNodes.append(len(nodeRefs) - closed)
+        closedLoops.append(closed)
+    return nbNodes, closedLoops
 
 
 def writeXML(
@@ -179,20 +291,29 @@ def writeXML(
     """
     IDCounter = pyhgtmap.output.Id(start_node_id)
     versionString = ' version="1"' if osm_version > 0.5 else ""
-    ways = []
+    nodeTemplate = makeNodeTemplate(versionString, timestampString)
+    # Ways are built at once from their number of nodes; their nodes IDs are
+    # consecutive
+    nbNodes: list[int] = []
+    closedLoops: list[bool] = []
+    elevations: list[int] = []
     for elevation, contour_list in tile_contours.contours.items():
         if not contour_list:
             continue
-        ways.extend(
-            _writeContourNodes(
-                output,
-                contour_list,
-                elevation,
-                IDCounter,
-                versionString,
-                timestampString,
-            ),
+        # Nodes of all the contours of an elevation are written at once
+        nodesBuffer = io.BytesIO()
+        elevationNbNodes, elevationClosedLoops = _writeContourNodes(
+            nodesBuffer,
+            contour_list,
+            IDCounter,
+            nodeTemplate,
         )
+        output.write(nodesBuffer.getvalue())
         # output.flush()
+        nbNodes.extend(elevationNbNodes)
+        closedLoops.extend(elevationClosedLoops)
+        elevations.extend([elevation] * len(elevationNbNodes))
     newId = IDCounter.getId()
-    return newId, pyhgtmap.output.build_efficient_ways(ways)
+    return newId, pyhgtmap.output.make_ways(
+        start_node_id, nbNodes, closedLoops, elevations
+    )
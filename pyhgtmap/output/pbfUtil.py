@@ -13,6 +13,7 @@ import numpy
 import numpy.typing
 
 import pyhgtmap.output
+from pyhgtmap.hgt.contour import is_closed_path
 
 if TYPE_CHECKING:
     from pyhgtmap import BBox
@@ -82,21 +83,27 @@ class Output(pyhgtmap.output.Output):
 
         The waylist is split up to make sure the pbf blobs will not be too big.
         """
-        for ind, way in enumerate(ways):
-            closed_loop_id: list[int] = (
-                [way["first_node_id"]] if way["closed_loop"] else []
-            )
-            osm_way = npyosmium.osm.mutable.Way(
-                id=startWayId + ind,
-                tags=(
-                    ("ele", str(way["elevation"])),
+        # Tags only depend on the elevation, shared by many ways: classify each
+        # elevation only once
+        tags_per_elevation: dict[int, tuple[tuple[str, str], ...]] = {}
+        # Iterate over plain python values rather than numpy records
+        for ind, (first_node_id, nb_nodes, closed_loop, elevation) in enumerate(
+            ways.tolist(),
+        ):
+            tags = tags_per_elevation.get(elevation)
+            if tags is None:
+                tags = tags_per_elevation[elevation] = (
+                    ("ele", str(elevation)),
                     ("contour", "elevation"),
-                    ("contour_ext", self.elevClassifier(way["elevation"])),
-                ),
-                nodes=list(
-                    range(way["first_node_id"], way["first_node_id"] + way["nb_nodes"]),
+                    ("contour_ext", self.elevClassifier(elevation)),
                 )
-                + closed_loop_id,
+            nodes = list(range(first_node_id, first_node_id + nb_nodes))
+            if closed_loop:
+                nodes.append(first_node_id)
+            osm_way = npyosmium.osm.mutable.Way(
+                id=startWayId + ind,
+                tags=tags,
+                nodes=nodes,
             )
             self.osm_writer.add_way(osm_way)
 
@@ -114,10 +121,16 @@ class Output(pyhgtmap.output.Output):
         start_node_id: int,
         osm_version: float,
     ) -> tuple[int, pyhgtmap.output.EfficientWaysType]:
-        logger.debug(f"writeNodes - startId: {start_node_id}")
+        logger.debug("writeNodes - startId: %d", start_node_id)
 
-        ways: list[pyhgtmap.output.WayType] = []
-        next_node_id: int = start_node_id
+        # Ways are built at once from their number of nodes; their nodes IDs are
+        # consecutive
+        nb_nodes: list[int] = []
+        closed_loops: list[bool] = []
+        elevations: list[int] = []
+        # Nodes of all the contours are written in a single bulk call, as their IDs
+        # are consecutive; this avoids paying the pyosmium call overhead per contour
+        nodes_coords: list[numpy.ndarray] = []
 
         for elevation, contour_list in tile_contours.contours.items():
             # logger.debug(f"writeNodes - elevation: {elevation}")
@@ -126,23 +139,23 @@ class Output(pyhgtmap.output.Output):
                 continue
             for contour in contour_list:
                 # Add the points corresponding to the individual contour, and prepare the way for later step
-                is_closed_way: bool = bool(numpy.all(contour[0] == contour[-1]))
+                is_closed_way: bool = is_closed_path(contour)
                 if is_closed_way:
                     # Close way by re-using first node instead of a new one; last node is not needed
                     contour = contour[:-1]
-                self.osm_writer.add_locations(contour, next_node_id)
-
-                ways.append(
-                    pyhgtmap.output.WayType(
-                        next_node_id,
-                        len(contour),
-                        is_closed_way,
-                        elevation,
-                    ),
-                )
-                # Bump ID for next iteration
-                next_node_id += len(contour)
+                nodes_coords.append(contour)
+                nb_nodes.append(len(contour))
+                closed_loops.append(is_closed_way)
+                elevations.append(elevation)
+
+        next_node_id: int = start_node_id + sum(nb_nodes)
+        if nodes_coords:
+            self.osm_writer.add_locations(
+                numpy.concatenate(nodes_coords), start_node_id
+            )
 
-        logger.debug(f"writeNodes - next_node_id: {next_node_id}")
+        logger.debug("writeNodes - next_node_id: %d", next_node_id)
 
-        return next_node_id, pyhgtmap.output.build_efficient_ways(ways)
+        return next_node_id, pyhgtmap.output.make_ways(
+            start_node_id, nb_nodes, closed_loops, elevations
+        )
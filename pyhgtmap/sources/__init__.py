@@ -132,6 +132,11 @@ class Source(ABC, metaclass=AutoRegister(SOURCES_TYPES_REGISTRY)):  # type: igno
 
         return file_name
 
+    def close(self) -> None:
+        """Release resources held by the source (eg. network connections), once
+        done with it."""
+        # Nothing by default
+
     def show_banner(self) -> None:
         """Show banner referencing original source, only once per session."""
         if not self._banner_showed:
@@ -85,6 +85,25 @@ class Alos(Source):
         )
         if self.plugin_config.user is None or self.plugin_config.password is None:
             raise ValueError("ALOS user and password are required")
+        self._client: httpx.Client | None = None
+
+    def _get_client(self) -> httpx.Client:
+        """HTTP client shared by all the downloads, created on first use.
+        Its connections pool avoids a new connection (and TLS handshake) per tile."""
+        if self._client is None:
+            # ALOS is quite slow to generate download file
+            timeout = httpx.Timeout(10, read=120.0)
+            self._client = httpx.Client(
+                auth=(self.plugin_config.user, self.plugin_config.password),
+                timeout=timeout,
+            )
+        return self._client
+
+    def close(self) -> None:
+        """Close the HTTP client and its connections, if any."""
+        if self._client is not None:
+            self._client.close()
+            self._client = None
 
     def download_missing_file(
         self,
@@ -93,13 +112,7 @@ class Alos(Source):
         output_file_name: str,
     ) -> None:
         url = get_url_for_tile(area)
-        # ALOS is quite slow to generate download file
-        timeout = httpx.Timeout(10, read=120.0)
-        client = httpx.Client(
-            auth=(self.plugin_config.user, self.plugin_config.password),
-            timeout=timeout,
-        )
-        r = client.get(url)
+        r = self._get_client().get(url)
         if r.status_code != 200:
             raise FileNotFoundError(
                 f"Unable to download {url}; HTTP code {r.status_code}"
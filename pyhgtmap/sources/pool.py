@@ -63,6 +63,11 @@ class Pool:
             )
         )
 
+    def close(self) -> None:
+        """Close all the sources instantiated so far."""
+        for source in self:
+            source.close()
+
     def __iter__(self) -> Iterator[Source]:
         yield from cast(Iterator[Source], self._cached_registry)
 
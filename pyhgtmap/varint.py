@@ -1,3 +1,12 @@
+from __future__ import annotations
+
+import numpy
+
+# A 64 bits integer is encoded on at most 10 groups of 7 bits
+MAX_VARINT_LEN = 10
+_VARINT_SHIFTS = numpy.arange(0, 7 * MAX_VARINT_LEN, 7, dtype=numpy.uint64)
+
+
 def int2str(n) -> bytes:
     b = n & 127
     n >>= 7
@@ -36,3 +45,28 @@ def writableString(string) -> bytes:
 def join(sequence) -> bytes:
     """takes a sequence of bytes-like objects and returns them as joined bytes object"""
     return b"".join(sequence)
+
+
+def int_array2str(values: numpy.ndarray) -> tuple[numpy.ndarray, numpy.ndarray]:
+    """vectorized int2str(), for an array of unsigned integers.
+
+    Returns a (len(values), MAX_VARINT_LEN) array of bytes, each row holding the
+    encoding of the corresponding value followed by padding, and the actual number
+    of bytes of each encoding.
+    """
+    values = numpy.asarray(values, dtype=numpy.uint64)
+    groups = values[:, None] >> _VARINT_SHIFTS
+    lengths = numpy.maximum(numpy.count_nonzero(groups, axis=1), 1)
+    encoded = (groups & 127).astype(numpy.uint8)
+    # all the bytes but the last one have their high bit set
+    encoded[numpy.arange(MAX_VARINT_LEN) < (lengths - 1)[:, None]] |= 128
+    return encoded, lengths
+
+
+def sint_array2str(values: numpy.ndarray) -> tuple[numpy.ndarray, numpy.ndarray]:
+    """vectorized sint2str(), for an array of signed integers.
+    See int_array2str() for the result.
+    """
+    values = numpy.asarray(values, dtype=numpy.int64)
+    # same as sint2str(): sign moved to the lowest bit
+    return int_array2str(((values << 1) ^ (values >> 63)).view(numpy.uint64))
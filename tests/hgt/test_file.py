@@ -11,6 +11,7 @@ from pyhgtmap.configuration import Configuration
 from pyhgtmap.hgt.file import (
     HgtFile,
     HgtTile,
+    build_z_data,
     calc_hgt_area,
     clip_polygons,
     parse_geotiff_bbox,
@@ -86,6 +87,8 @@ class TestHgtFile:
             "tile with 151 x 1201 points, bbox: (6.00, 43.75, 7.00, 43.88); minimum elevation: 327.00; maximum elevation: 1908.00",
             "tile with 151 x 1201 points, bbox: (6.00, 43.88, 7.00, 44.00); minimum elevation: 317.00; maximum elevation: 1923.00",
         ]
+        # Nodes estimation is kept, and matches the threshold
+        assert all(0 < tile.estimated_nb_nodes <= 500000 for tile in tiles)
         assert tiles[0].bbox() == (MIN_LON, MIN_LAT, MAX_LON, pytest.approx(43.5))
         assert tiles[0].bbox(doTransform=False) == (
             MIN_LON,
@@ -180,6 +183,24 @@ class TestHgtFile:
             ) == (MIN_LON, MIN_LAT, MAX_LON, MAX_LAT)
 
 
+@pytest.mark.parametrize(
+    ("feet_steps", "expected", "expected_dtype"),
+    [
+        (False, [[0, 100], [-10, 0]], numpy.float32),
+        # Feet conversion must not lose precision, as it would shift contours
+        (True, [[0, 100 * (1 / 0.3048)], [-10 * (1 / 0.3048), 0]], numpy.float64),
+    ],
+)
+def test_build_z_data(
+    feet_steps: bool, expected: list[list[float]], expected_dtype: type
+) -> None:
+    raw_data = numpy.array([[0, 100], [-10, -0x8000]], dtype=">i2")
+    z_data = build_z_data(raw_data, -0x8000, 1, feet_steps)
+    assert z_data.dtype == expected_dtype
+    numpy.testing.assert_array_equal(z_data.mask, [[False, False], [False, True]])
+    numpy.testing.assert_array_equal(z_data.filled(0), expected)
+
+
 def test_polygon_mask() -> None:
     x_data = numpy.array([0, 1, 2, 3, 4, 5])
     y_data = numpy.array([0, 1, 2, 3, 4, 5])
@@ -8,7 +8,10 @@ import os
 import shutil
 import sys
 import tempfile
-from contextlib import contextmanager
+import time
+from concurrent.futures.process import BrokenProcessPool
+from contextlib import contextmanager, suppress
+from multiprocessing.shared_memory import SharedMemory
 from typing import TYPE_CHECKING, Callable, NamedTuple
 from unittest import mock
 from unittest.mock import MagicMock, Mock
@@ -20,7 +23,13 @@ import pytest
 
 from pyhgtmap import BBox
 from pyhgtmap.configuration import Configuration
-from pyhgtmap.hgt.processor import HgtFilesProcessor
+from pyhgtmap.hgt.processor import (
+    HgtFilesProcessor,
+    _compute_tile_worker,
+    _init_worker,
+    _pin_worker,
+    _process_tile_worker,
+)
 from pyhgtmap.hgt.tile import TileContours
 from tests import TEST_DATA_PATH
 
@@ -285,10 +294,13 @@ class TestHgtFilesProcessor:
                 options.area = "6:43:8:44"
                 # Increase step size to speed up test case
                 options.contourStepSize = 500
-                # Instrument method without changing its behavior
+                # Instrument methods without changing their behavior
                 processor.process_tile_internal = Mock(  # type: ignore[method-assign]
                     side_effect=processor.process_tile_internal,
                 )
+                processor.write_tile = Mock(  # type: ignore[method-assign]
+                    side_effect=processor.write_tile,
+                )
                 processor.process_files(files_list)
                 out_files_names: list[str] = sorted(glob.glob("*.osm.pbf"))
                 # We may have more files generated (eg. .coverage ones)
@@ -296,9 +308,14 @@ class TestHgtFilesProcessor:
                     "lon6.00_8.00lat43.00_44.00_local-source.osm.pbf",
                 ], f"out_files_names mismatch; {out_files_names}"
 
-                # process_tile_internal called in main process when parallelization is not used
-                # (and no per-tile parallelization is used in single output mode)
-                assert processor.process_tile_internal.call_count == len(files_list)
+                # Output is always written by the main process
+                assert processor.write_tile.call_count == len(files_list)
+                if nb_jobs == 1:
+                    # process_tile_internal called in main process when parallelization is not used
+                    assert processor.process_tile_internal.call_count == len(files_list)
+                else:
+                    # Contours are computed by the children
+                    processor.process_tile_internal.assert_not_called()
 
                 # Ensure nodes and ways IDs do not overlap between generated files
                 # (they should actually be continuous, but we really only care about overlapping)
@@ -308,6 +325,111 @@ class TestHgtFilesProcessor:
             for coverage_file in glob.glob(os.path.join(tempdir_name, ".coverage.*")):
                 shutil.move(coverage_file, ".")
 
+    @staticmethod
+    @pytest.mark.skipif(
+        sys.platform.startswith("win"),
+        reason="Multiprocessing not supported on Windows",
+    )
+    def test_process_files_in_pool_write_error(
+        default_options: Configuration,
+    ) -> None:
+        """Pool must not hang when writing fails while tiles are still pending."""
+        default_options.maxNodesPerTile = 0
+        run_in_spawned_process(
+            TestHgtFilesProcessor._test_process_files_in_pool_write_error,
+            default_options,
+        )
+
+    @staticmethod
+    def _test_process_files_in_pool_write_error(options) -> None:
+        processor = HgtFilesProcessor(
+            2,
+            node_start_id=100,
+            way_start_id=200,
+            options=options,
+        )
+        options.area = "6:43:7:44"
+        options.contourStepSize = 500
+        # More tiles than the number of tiles allowed in flight
+        files_list: list[tuple[str, bool]] = [
+            (os.path.join(TEST_DATA_PATH, "N43E006.hgt"), False),
+        ] * 8
+
+        def failing_write_tile(*args) -> None:
+            # Let the workers process the tiles in flight
+            time.sleep(1)
+            raise RuntimeError("write failed")
+
+        processor.write_tile = Mock(  # type: ignore[method-assign]
+            side_effect=failing_write_tile,
+        )
+        # Record shared memory blocks created for the tiles
+        blocks_names: list[str] = []
+
+        def record_shared_memory(*args, **kwargs) -> SharedMemory:
+            shm = SharedMemory(*args, **kwargs)
+            if kwargs.get("create"):
+                blocks_names.append(shm.name)
+            return shm
+
+        with (
+            mock.patch("pyhgtmap.hgt.processor.get_osm_output"),
+            mock.patch(
+                "pyhgtmap.hgt.tile.SharedMemory", side_effect=record_shared_memory
+            ),
+            pytest.raises(RuntimeError, match="write failed"),
+        ):
+            processor.process_files(files_list)
+        processor.write_tile.assert_called_once()
+        # Tiles not processed by the workers must not leak their shared memory block
+        assert len(blocks_names) > 1
+        leaked_blocks: list[str] = []
+        for block_name in blocks_names:
+            with suppress(FileNotFoundError):
+                SharedMemory(name=block_name).close()
+                leaked_blocks.append(block_name)
+        assert leaked_blocks == []
+
+    @staticmethod
+    @pytest.mark.skipif(
+        sys.platform.startswith("win"),
+        reason="Multiprocessing not supported on Windows",
+    )
+    def test_process_files_in_pool_worker_killed(
+        default_options: Configuration,
+    ) -> None:
+        """Pool must not hang when a worker is killed while processing a tile."""
+        default_options.maxNodesPerTile = 0
+        run_in_spawned_process(
+            TestHgtFilesProcessor._test_process_files_in_pool_worker_killed,
+            default_options,
+        )
+
+    @staticmethod
+    def _test_process_files_in_pool_worker_killed(options) -> None:
+        processor = HgtFilesProcessor(
+            2,
+            node_start_id=100,
+            way_start_id=200,
+            options=options,
+        )
+        options.area = "6:43:7:44"
+        files_list: list[tuple[str, bool]] = [
+            (os.path.join(TEST_DATA_PATH, "N43E006.hgt"), False),
+        ] * 8
+
+        def killed_get_tile_contours(tile) -> None:
+            # Simulate a worker killed by the OOM killer or a crash in native code
+            os._exit(1)
+
+        # Processor is inherited by the forked workers
+        processor.get_tile_contours = killed_get_tile_contours  # type: ignore[method-assign]
+        with (
+            mock.patch("pyhgtmap.hgt.processor.get_osm_output"),
+            pytest.raises(BrokenProcessPool),
+        ):
+            processor.process_files(files_list)
+
     @staticmethod
     def test_get_osm_output(default_options: Configuration) -> None:
         processor = HgtFilesProcessor(
@@ -357,6 +479,18 @@ class TestHgtFilesProcessor:
             )
             assert output1 is output2
 
+    @staticmethod
+    def test_reserve_ids(default_options: Configuration) -> None:
+        processor = HgtFilesProcessor(
+            1,
+            node_start_id=100,
+            way_start_id=200,
+            options=default_options,
+        )
+        assert processor.reserve_ids(10, 2) == (100, 200)
+        assert processor.reserve_ids(5, 1) == (110, 202)
+        assert processor.reserve_ids(0, 0) == (115, 203)
+
     @staticmethod
     def test_node_id_overflow(default_options: Configuration) -> None:
         # Ensure node ID doesn't overflow limit of int32
@@ -366,8 +500,8 @@ class TestHgtFilesProcessor:
             way_start_id=200,
             options=default_options,
         )
-        assert processor.get_and_inc_counter(processor.next_node_id, 1) == 2147483647
-        assert processor.get_and_inc_counter(processor.next_node_id, 1) == 2147483648
+        assert processor.reserve_ids(1, 0)[0] == 2147483647
+        assert processor.reserve_ids(1, 0)[0] == 2147483648
 
     @staticmethod
     def test_way_id_overflow(default_options: Configuration) -> None:
@@ -378,8 +512,8 @@ class TestHgtFilesProcessor:
             way_start_id=2147483647,
             options=default_options,
         )
-        assert processor.get_and_inc_counter(processor.next_way_id, 1) == 2147483647
-        assert processor.get_and_inc_counter(processor.next_way_id, 1) == 2147483648
+        assert processor.reserve_ids(0, 1)[1] == 2147483647
+        assert processor.reserve_ids(0, 1)[1] == 2147483648
 
     @staticmethod
     def test_process_tile_internal_empty_contour(
@@ -396,6 +530,7 @@ class TestHgtFilesProcessor:
         # Empty tile
         tile_contours = TileContours(nb_nodes=0, nb_ways=0, contours={})
         tile_mock = MagicMock()
+        tile_mock.is_constant.return_value = False
         tile_mock.get_contours.return_value = tile_contours
         tile_mock.__str__.return_value = "Tile (28.00, 42.50, 29.00, 43.00)"  # type: ignore[attr-defined]
         with tempfile.TemporaryDirectory() as tempdir_name, cwd(tempdir_name):
@@ -408,56 +543,153 @@ class TestHgtFilesProcessor:
                 in caplog.text
             )
 
+    @staticmethod
+    def test_get_tile_contours_constant(
+        default_options: Configuration,
+        caplog: pytest.LogCaptureFixture,
+    ) -> None:
+        """Contours of flat tiles must not be computed."""
+        processor = HgtFilesProcessor(
+            1,
+            node_start_id=100,
+            way_start_id=200,
+            options=default_options,
+        )
+        tile_mock = MagicMock()
+        tile_mock.is_constant.return_value = True
+        tile_mock.__str__.return_value = "Tile (28.00, 42.50, 29.00, 43.00)"  # type: ignore[attr-defined]
+        caplog.set_level(logging.INFO, logger="pyhgtmap.hgt.processor")
+        assert processor.get_tile_contours(tile_mock) is None
+        tile_mock.get_contours.assert_not_called()
+        assert (
+            "Tile (28.00, 42.50, 29.00, 43.00) has a constant elevation, skipping."
+            in caplog.text
+        )
+
+    @staticmethod
+    def test_process_tile_worker(
+        default_options: Configuration,
+        caplog: pytest.LogCaptureFixture,
+        monkeypatch: pytest.MonkeyPatch,
+    ) -> None:
+        """Ensure errors raised while processing a tile in a worker are reported."""
+        processor = HgtFilesProcessor(
+            2,
+            node_start_id=100,
+            way_start_id=200,
+            options=default_options,
+        )
+        tile_mock = MagicMock()
+        shared_tile_mock = MagicMock()
+        shared_tile_mock.get_tile.return_value = tile_mock
+        shared_tile_mock.__str__.return_value = "Tile (28.00, 42.50, 29.00, 43.00)"  # type: ignore[attr-defined]
+        processor.process_tile_internal = Mock()  # type: ignore[method-assign]
+        monkeypatch.setattr("pyhgtmap.hgt.processor._worker_processor", processor)
+
+        # Success
+        assert _process_tile_worker(("file.hgt", shared_tile_mock)) is None
+        processor.process_tile_internal.assert_called_once_with("file.hgt", tile_mock)
+
+        # Failure
+        processor.process_tile_internal.side_effect = RuntimeError("boom")
+        assert (
+            _process_tile_worker(("file.hgt", shared_tile_mock))
+            == "file.hgt: Tile (28.00, 42.50, 29.00, 43.00)"
+        )
+        assert "Exception caught in worker process: boom" in caplog.text
+
+    @staticmethod
+    def test_compute_tile_worker(
+        default_options: Configuration,
+        caplog: pytest.LogCaptureFixture,
+        monkeypatch: pytest.MonkeyPatch,
+    ) -> None:
+        """Ensure contours computed in a worker are returned for writing."""
+        processor = HgtFilesProcessor(
+            2,
+            node_start_id=100,
+            way_start_id=200,
+            options=default_options,
+        )
+        tile_contours = TileContours(nb_nodes=10, nb_ways=2, contours={})
+        tile_mock = MagicMock()
+        tile_mock.bbox.return_value = BBox(28, 42.5, 29, 43)
+        shared_tile_mock = MagicMock()
+        shared_tile_mock.get_tile.return_value = tile_mock
+        shared_tile_mock.__str__.return_value = "Tile (28.00, 42.50, 29.00, 43.00)"  # type: ignore[attr-defined]
+        processor.get_tile_contours = Mock(return_value=tile_contours)  # type: ignore[method-assign]
+        monkeypatch.setattr("pyhgtmap.hgt.processor._worker_processor", processor)
+
+        # Success
+        assert _compute_tile_worker(("file.hgt", shared_tile_mock)) == (
+            "file.hgt",
+            BBox(28, 42.5, 29, 43),
+            tile_contours,
+        )
+        processor.get_tile_contours.assert_called_once_with(tile_mock)
+
+        # Nothing to write
+        processor.get_tile_contours.return_value = None
+        assert _compute_tile_worker(("file.hgt", shared_tile_mock)) is None
+
+        # Failure
+        processor.get_tile_contours.side_effect = RuntimeError("boom")
+        assert (
+            _compute_tile_worker(("file.hgt", shared_tile_mock))
+            == "file.hgt: Tile (28.00, 42.50, 29.00, 43.00)"
+        )
+        assert "Exception caught in worker process: boom" in caplog.text
+
     @staticmethod
     @pytest.mark.skipif(
-        sys.platform.startswith("win"),
-        reason="Multiprocessing not supported on Windows",
+        not hasattr(os, "sched_setaffinity"), reason="CPU affinity not supported"
     )
     @pytest.mark.parametrize(
-        ("nb_jobs", "nb_jobs_in_use", "expected_fork"),
+        ("process_name", "expected_cpu"),
         [
-            # 2 max jobs -> parallelization enabled
-            (2, 0, True),
-            # 2 max jobs, but both used -> parallelization disabled
-            (2, 2, False),
-            # 1 max job -> parallelization disabled
-            (1, 0, False),
+            ("ForkProcess-1", 2),
+            ("ForkProcess-2", 5),
+            ("ForkProcess-3", 2),
         ],
     )
-    def test_try_parallelizing(
-        default_options: Configuration,
-        nb_jobs: int,
-        nb_jobs_in_use: int,
-        expected_fork: bool,
+    def test_pin_worker(process_name: str, expected_cpu: int) -> None:
+        """Pool workers are pinned to the available CPUs, in turn."""
+        with (
+            mock.patch("multiprocessing.current_process") as current_process_mock,
+            mock.patch("os.sched_getaffinity", return_value={5, 2}),
+            mock.patch("os.sched_setaffinity") as sched_setaffinity_mock,
+        ):
+            current_process_mock.return_value.name = process_name
+            _pin_worker()
+        sched_setaffinity_mock.assert_called_once_with(0, {expected_cpu})
+
+    @staticmethod
+    def test_pin_worker_not_in_pool() -> None:
+        """Processes which aren't pool workers are left untouched."""
+        with (
+            mock.patch("multiprocessing.current_process") as current_process_mock,
+            mock.patch("os.sched_setaffinity", create=True) as sched_setaffinity_mock,
+        ):
+            current_process_mock.return_value.name = "MainProcess"
+            _pin_worker()
+        sched_setaffinity_mock.assert_not_called()
+
+    @staticmethod
+    @pytest.mark.parametrize("pin_workers", [False, True])
+    def test_init_worker_pinning(
+        pin_workers: bool, default_options: Configuration
     ) -> None:
-        # Prepare
+        """Workers are only pinned to a CPU when requested."""
+        default_options.pinWorkers = pin_workers
         processor = HgtFilesProcessor(
-            nb_jobs,
+            2,
             node_start_id=100,
             way_start_id=200,
             options=default_options,
         )
-        # Queue to ensure some_func is called properly, from which process
-        queue: multiprocessing.Queue[tuple] = multiprocessing.Queue()
-
-        def some_func(*args, **kwargs) -> None:
-            queue.put((args, kwargs, os.getpid()))
-
-        some_args = (1, 2, 3)
-        some_kwargs = {"a": 1, "b": 2, "c": 3}
-
-        # Simulate already running children
-        for _ in range(nb_jobs_in_use):
-            processor.available_children.acquire()
-
-        # Test
-        processor.try_parallelizing(some_func, *some_args, **some_kwargs)
-
-        # Check
-        res = queue.get()
-        assert res[0] == some_args
-        assert res[1] == some_kwargs
-        if expected_fork:
-            assert res[2] != os.getpid()
-        else:
-            assert res[2] == os.getpid()
+        with (
+            mock.patch("pyhgtmap.hgt.processor._pin_worker") as pin_worker_mock,
+            mock.patch("pyhgtmap.hgt.processor._worker_processor"),
+        ):
+            _init_worker(processor)
+        assert pin_worker_mock.called == pin_workers
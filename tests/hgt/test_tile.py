@@ -1,20 +1,20 @@
 from __future__ import annotations
 
 import os
-from typing import TYPE_CHECKING
+import pickle
+from multiprocessing.shared_memory import SharedMemory
 from unittest.mock import Mock
 
 import matplotlib.pyplot as plt
 import numpy
 import pytest
 
+from pyhgtmap import BBox
 from pyhgtmap.configuration import Configuration
 from pyhgtmap.hgt.file import HgtFile
+from pyhgtmap.hgt.tile import HgtTile, SharedHgtTile, TileContours
 from tests import TEST_DATA_PATH
 
-if TYPE_CHECKING:
-    from pyhgtmap.hgt.tile import HgtTile, TileContours
-
 HGT_SIZE: int = 1201
 
 
@@ -136,6 +136,99 @@ class TestHgtTile:
         # contourLines must be called only once thanks to caching
         tile.contourLines.assert_called_once_with(20, 0, False, None, None, None)
 
+    @staticmethod
+    def test_is_constant(toulon_tiles_raw: list[HgtTile]) -> None:
+        assert not toulon_tiles_raw[0].is_constant()
+        flat_tile = HgtTile(
+            bbox=BBox(6, 43, 7, 44),
+            data=numpy.ma.array(numpy.full((10, 10), 12.0)),
+            increments=(0.1, 0.1),
+            polygons=None,
+            mask=None,
+            transform=None,
+        )
+        assert flat_tile.is_constant()
+
+    @staticmethod
+    def test_get_contours_no_level() -> None:
+        """No contour computation when no level is within the elevation range."""
+        tile = HgtTile(
+            bbox=BBox(6, 43, 7, 44),
+            data=numpy.ma.array(numpy.linspace(1, 19, 100).reshape((10, 10))),
+            increments=(0.1, 0.1),
+            polygons=None,
+            mask=None,
+            transform=None,
+        )
+        assert not tile.contour_levels(stepCont=20)
+        assert tile.contour_levels(stepCont=10) == range(10, 20, 10)
+        tile.contourLines = Mock(side_effect=tile.contourLines)  # type: ignore[method-assign]
+        assert tile.get_contours(step_cont=20) == TileContours(0, 0, {})
+        tile.contourLines.assert_not_called()
+
+    @staticmethod
+    def test_bbox_cache() -> None:
+        """Transformed bbox must be computed only once."""
+        transform = Mock(side_effect=lambda coordinates: coordinates)
+        tile = HgtTile(
+            bbox=BBox(6, 43, 7, 44),
+            data=numpy.ma.array(numpy.arange(100.0).reshape((10, 10))),
+            increments=(0.1, 0.1),
+            polygons=None,
+            mask=None,
+            transform=transform,
+        )
+        assert tile.bbox() == BBox(6, 43, 7, 44)
+        assert tile.bbox() == BBox(6, 43, 7, 44)
+        assert str(tile) == "Tile (6.00, 43.00, 7.00, 44.00)"
+        transform.assert_called_once()
+
+    @staticmethod
+    def test_pickle(toulon_tiles_raw: list[HgtTile]) -> None:
+        """Tiles must be picklable, to be sent to worker processes."""
+        tile = toulon_tiles_raw[0]
+        unpickled_tile: HgtTile = pickle.loads(pickle.dumps(tile))  # noqa: S301
+        assert str(unpickled_tile) == str(tile)
+        numpy.testing.assert_array_equal(unpickled_tile.zData, tile.zData)
+        unpickled_contours = unpickled_tile.get_contours()
+        contours = tile.get_contours()
+        assert unpickled_contours.nb_nodes == contours.nb_nodes
+        assert unpickled_contours.nb_ways == contours.nb_ways
+
+    @staticmethod
+    def test_shared_tile(toulon_tiles_raw: list[HgtTile]) -> None:
+        """Tile data must be transferred via shared memory, released once loaded."""
+        tile = toulon_tiles_raw[0]
+        # Add some void area
+        tile.zData[:10, :10] = numpy.ma.masked
+        shared_tile = SharedHgtTile(tile)
+        shm_name = shared_tile.shm.name
+        pickled_shared_tile = pickle.dumps(shared_tile)
+        # Elevation data is not part of the pickled state
+        assert len(pickled_shared_tile) < tile.zData.nbytes
+        unpickled_tile = pickle.loads(pickled_shared_tile).get_tile()  # noqa: S301
+        assert str(unpickled_tile) == str(tile)
+        numpy.testing.assert_array_equal(unpickled_tile.zData, tile.zData)
+        numpy.testing.assert_array_equal(
+            numpy.ma.getmaskarray(unpickled_tile.zData),
+            numpy.ma.getmaskarray(tile.zData),
+        )
+        assert unpickled_tile.get_contours().nb_nodes == tile.get_contours().nb_nodes
+        # Shared memory block must have been released
+        with pytest.raises(FileNotFoundError):
+            SharedMemory(name=shm_name)
+
+    @staticmethod
+    def test_shared_tile_release_block(toulon_tiles_raw: list[HgtTile]) -> None:
+        """Shared memory block of a tile never loaded can be released by its name."""
+        shared_tile = SharedHgtTile(toulon_tiles_raw[0])
+        shared_tile.shm.close()
+        SharedHgtTile.release_block(shared_tile.name)
+        with pytest.raises(FileNotFoundError):
+            SharedMemory(name=shared_tile.name)
+        # Releasing an already released block is a no-op
+        SharedHgtTile.release_block(shared_tile.name)
+
     @staticmethod
     # Test contours generation with several rdp_epsilon values
     # Results must be close enough not to trigger an exception with mpl plugin
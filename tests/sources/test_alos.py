@@ -2,8 +2,10 @@ import os
 from io import BytesIO
 from pathlib import Path
 from tempfile import TemporaryDirectory
+from unittest import mock
 from zipfile import ZipFile
 
+import httpx
 import pytest
 from pytest_httpx import HTTPXMock
 
@@ -97,6 +99,61 @@ class TestAlos:
             with open(out_file_name) as out_file:
                 assert out_file.read() == "0" * 5
 
+    @staticmethod
+    def test_download_missing_files_shared_client(
+        httpx_mock: HTTPXMock,
+        alos_configuration: Configuration,
+    ) -> None:
+        """A single HTTP client is used to download several tiles."""
+        with TemporaryDirectory() as temp_dir:
+            # Prepare
+            conf_dir = os.path.join(temp_dir, "conf")
+            hgt_dir = os.path.join(temp_dir, "hgt")
+            Path(hgt_dir).mkdir()
+            for area, alos_area in (("N42E004", "N042E004"), ("N43E004", "N043E004")):
+                httpx_mock.add_response(
+                    url=get_url_for_tile(area),
+                    method="GET",
+                    content=get_alos_zipped_file(alos_area).read(),
+                )
+
+            # Test
+            with mock.patch("httpx.Client", wraps=httpx.Client) as client_mock:
+                alos = Alos(hgt_dir, conf_dir, alos_configuration)
+                alos.download_missing_file(
+                    "N42E004", 1, os.path.join(hgt_dir, "N42E004.hgt")
+                )
+                alos.download_missing_file(
+                    "N43E004", 1, os.path.join(hgt_dir, "N43E004.hgt")
+                )
+
+            # Check
+            client_mock.assert_called_once()
+            assert os.path.isfile(os.path.join(hgt_dir, "N42E004.hgt"))
+            assert os.path.isfile(os.path.join(hgt_dir, "N43E004.hgt"))
+
+    @staticmethod
+    def test_close(alos_configuration: Configuration) -> None:
+        """HTTP client is closed with the source."""
+        with (
+            TemporaryDirectory() as temp_dir,
+            mock.patch("httpx.Client") as client_mock,
+        ):
+            client_mock.return_value.get.return_value.status_code = 404
+            alos = Alos(temp_dir, temp_dir, alos_configuration)
+            # Nothing to close before any download
+            alos.close()
+            client_mock.assert_not_called()
+            with pytest.raises(FileNotFoundError):
+                alos.download_missing_file(
+                    "N42E004", 1, os.path.join(temp_dir, "N42E004.hgt")
+                )
+            alos.close()
+            client_mock.return_value.close.assert_called_once_with()
+            # Closing again is a no-op
+            alos.close()
+            client_mock.return_value.close.assert_called_once_with()
+
     @staticmethod
     def test_download_missing_file_not_found(
         httpx_mock: HTTPXMock,
@@ -1,3 +1,5 @@
+from unittest import mock
+
 import pytest
 from class_registry.registry import RegistryKeyError
 
@@ -86,6 +88,16 @@ class TestPool:
             pool.get_source("dumm"),
         )
 
+    @staticmethod
+    def test_close(pool: Pool) -> None:
+        """Only instantiated sources are closed."""
+        with mock.patch.object(DummySource, "close") as close_mock:
+            pool.close()
+            close_mock.assert_not_called()
+            pool.get_source("dumm")
+            pool.close()
+            close_mock.assert_called_once_with()
+
     @staticmethod
     def test_available_sources_options(pool: Pool) -> None:
         # Don't test the full list, as some other unit test may register
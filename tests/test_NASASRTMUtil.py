@@ -91,3 +91,5 @@ def test_getFiles_multi_sources(
         ("hgt/SONN3/N02E002.hgt", False),
         ("hgt/SONN3/N03E002.hgt", False),
     ]
+    # Sources are released once all files are found
+    sources_pool_mock.return_value.close.assert_called_once_with()
@@ -22,3 +22,10 @@ def test_exclusions_o5m_pbf(capsys: pytest.CaptureFixture[str]) -> None:
         parse_command_line(["--pbf", "--o5m"])
     captured = capsys.readouterr()
     assert "error: argument --o5m: not allowed with argument --pbf" in captured.err
+
+
+def test_srtm_sources_version() -> None:
+    opts, _ = parse_command_line(
+        ["--source=view1,srtm3,srtm1", "--srtm-version=2.1", "--area=1:2:3:4"],
+    )
+    assert opts.dataSource == ["view1", "srtm3v2.1", "srtm1v2.1"]
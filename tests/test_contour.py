@@ -64,5 +64,26 @@ def test_simplify_path(
     )
 
 
+def test_paths_lengths() -> None:
+    numpy.testing.assert_allclose(
+        contour.paths_lengths(
+            [
+                numpy.array([(0, 0), (3, 4)]),
+                numpy.array([(10, 10), (10, 11), (11, 11), (10, 10)]),
+                numpy.array([(0, 0), (0, 0)]),
+            ],
+        ),
+        [5, 2 + 2**0.5, 0],
+    )
+    assert len(contour.paths_lengths([])) == 0
+
+
+def test_is_closed_path() -> None:
+    assert contour.is_closed_path(numpy.array([(1, 1), (1, 2), (2, 2), (1, 1)]))
+    assert not contour.is_closed_path(numpy.array([(1, 1), (1, 2), (1, 3)]))
+    # Only one coordinate matching
+    assert not contour.is_closed_path(numpy.array([(1, 1), (1, 2), (2, 1)]))
+
+
 class TestContour:
     pass
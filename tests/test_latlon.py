@@ -55,9 +55,36 @@ class TestDegreeLatLon:
         assert DegreeLatLon(-999, -888).to_string(3) == "S999W888"
 
     @staticmethod
-    def test_from_string_invalid() -> None:
+    def test_to_string_cache() -> None:
+        # Same string object is returned for the same tile
+        assert DegreeLatLon(1, 7).to_string(3) is DegreeLatLon(1, 7).to_string(3)
+
+    @staticmethod
+    def test_from_string_padding() -> None:
+        degree_lat_lon = DegreeLatLon.from_string("S005E010")
+        assert degree_lat_lon.lat == -5
+        assert degree_lat_lon.lon == 10
+        # Trailing characters are ignored
+        degree_lat_lon = DegreeLatLon.from_string("N43E006.hgt")
+        assert degree_lat_lon.lat == 43
+        assert degree_lat_lon.lon == 6
+
+    @staticmethod
+    @pytest.mark.parametrize(
+        "string",
+        [
+            "4532N 12259W",
+            "",
+            "N45",
+            "X45W122",
+            "N45X122",
+            "N4W122",
+            "N45W12",
+            "N4aW122",
+        ],
+    )
+    def test_from_string_invalid(string: str) -> None:
         # Test the from_string method with an invalid string representation
-        string = "4532N 12259W"
         with pytest.raises(ValueError, match="Invalid latlon string"):
             DegreeLatLon.from_string(string)
 
@@ -6,6 +6,7 @@ from unittest.mock import MagicMock, patch
 
 import pytest
 
+import pyhgtmap.NASASRTMUtil
 from pyhgtmap import main
 
 from . import TEST_DATA_PATH
@@ -18,15 +19,15 @@ if TYPE_CHECKING:
 
 @pytest.fixture
 def HgtFilesProcessor_mock() -> Generator[MagicMock, Any, None]:
-    """Fixture mocking pyhgtmap.main.HgtFilesProcessor."""
-    with patch("pyhgtmap.main.HgtFilesProcessor") as mock:
+    """Fixture mocking pyhgtmap.hgt.processor.HgtFilesProcessor, as used by main."""
+    with patch("pyhgtmap.hgt.processor.HgtFilesProcessor") as mock:
         yield mock
 
 
 @pytest.fixture
 def NASASRTMUtil_mock() -> Generator[MagicMock, Any, None]:
-    """Fixture mocking pyhgtmap.main.NASASRTMUtil."""
-    with patch("pyhgtmap.main.NASASRTMUtil") as mock:
+    """Fixture mocking pyhgtmap.NASASRTMUtil, as used by main."""
+    with patch.object(pyhgtmap, "NASASRTMUtil") as mock:
         yield mock
 
 
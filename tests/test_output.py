@@ -2,10 +2,14 @@
 
 from __future__ import annotations
 
+import gzip
+import io
 import os
+import shutil
 import tempfile
 from contextlib import suppress
 from typing import TYPE_CHECKING, Any, Callable
+from unittest import mock
 
 import npyosmium
 import npyosmium.io
@@ -16,7 +20,15 @@ import pytest
 
 from pyhgtmap import BBox
 from pyhgtmap.hgt.tile import TileContours
-from pyhgtmap.output import make_elev_classifier, o5mUtil, osmUtil, pbfUtil
+from pyhgtmap.output import (
+    Id,
+    make_elev_classifier,
+    make_nodes_ways,
+    make_ways,
+    o5mUtil,
+    osmUtil,
+    pbfUtil,
+)
 
 if TYPE_CHECKING:
     from collections.abc import Iterable
@@ -305,3 +317,145 @@ class TestOutputO5m:
 
             # Check file with osmium
             check_osmium_result(osm_file_name)
+
+    @staticmethod
+    def test_way_reference_section(elev_classifier, bounding_box: BBox) -> None:
+        """Node references are delta coded, closed ways going back to first node."""
+        with tempfile.TemporaryDirectory() as tempdir:
+            osm_output = o5mUtil.Output(
+                os.path.join(tempdir, "output.osm.o5m"),
+                osmVersion=0.6,
+                pyhgtmap_version="123",
+                bbox=bounding_box,
+                elevClassifier=elev_classifier,
+            )
+            # Open way: nodes 10, 11, 12, 13
+            assert (
+                osm_output.makeWayReferenceSection(10, 4, False) == b"\x14\x02\x02\x02"
+            )
+            assert osm_output.lastNodeId == 13
+            # Closed way: nodes 20, 21, 22, 20
+            assert (
+                osm_output.makeWayReferenceSection(20, 3, True) == b"\x0e\x02\x02\x03"
+            )
+            assert osm_output.lastNodeId == 20
+            osm_output.done()
+
+
+def test_encode_nodes_deltas() -> None:
+    deltas = numpy.array([[1, -1], [-200, 70000]])
+    assert o5mUtil.encodeNodesDeltas(deltas, b"\x02\x01\x00") == (
+        b"\x10\x05\x02\x01\x00\x02\x01"  # Node deltas (1, -1)
+        b"\x10\x08\x02\x01\x00\x8f\x03\xe0\xc5\x08"  # Node deltas (-200, 70000)
+    )
+
+
+def test_string_table() -> None:
+    table = o5mUtil.StringTable()
+    table.maxStringRef = 3
+    # New strings are returned as is, known ones as a reference from the latest one
+    assert table.stringOrIndex(b"a") == b"a"
+    assert table.stringOrIndex(b"b") == b"b"
+    assert table.stringOrIndex(b"a") == b"\x02"
+    assert table.stringOrIndex(b"b") == b"\x01"
+    assert table.stringOrIndex(b"c") == b"c"
+    assert table.stringOrIndex(b"a") == b"\x03"
+    # Oldest string is dropped when the table is full
+    assert table.stringOrIndex(b"d") == b"d"
+    assert table.stringOrIndex(b"a") == b"a"
+    assert table.stringOrIndex(b"c") == b"\x03"
+    # Long strings are never stored
+    assert table.stringOrIndex(b"x" * 251) == b"x" * 251
+    assert table.stringOrIndex(b"x" * 251) == b"x" * 251
+    table.reset()
+    assert table.stringOrIndex(b"c") == b"c"
+
+
+@pytest.mark.parametrize(
+    ("pigz", "parallel_gzip"),
+    [
+        (None, True),
+        ("gzip", True),
+        # Outputs written concurrently by pool workers
+        ("gzip", False),
+    ],
+)
+def test_osm_gzip_output(pigz: str | None, parallel_gzip: bool) -> None:
+    """Gzipped XML output, compressed in-process or by an external process (gzip
+    shares pigz command line)."""
+    with (
+        tempfile.TemporaryDirectory() as tempdir,
+        mock.patch(
+            "shutil.which",
+            return_value=shutil.which(pigz) if pigz else None,
+        ),
+    ):
+        osm_file_name = os.path.join(tempdir, "output.osm.gz")
+        osm_output = osmUtil.Output(
+            osm_file_name,
+            osmVersion=0.6,
+            pyhgtmap_version="123",
+            boundsTag="<bounds/>",
+            gzip=6,
+            elevClassifier=lambda elevation: "elevation_minor",
+            parallelGzip=parallel_gzip,
+        )
+        assert (osm_output.compressor is None) == (pigz is None or not parallel_gzip)
+        osm_output.done()
+        with gzip.open(osm_file_name) as osm_file:
+            assert osm_file.read().endswith(b"<bounds/>\n</osm>\n")
+
+
+def test_background_writer() -> None:
+    file = io.BytesIO()
+    writer = osmUtil.BackgroundWriter(file)
+    for i in range(100):
+        writer.write(b"%d," % i)
+    writer.flush()
+    assert file.getvalue() == b"".join(b"%d," % i for i in range(100))
+    writer.close()
+    assert file.closed
+
+
+def test_background_writer_error() -> None:
+    file = io.BytesIO()
+    writer = osmUtil.BackgroundWriter(file)
+    file.close()
+    # Error of the background thread is raised to the caller
+    writer.write(b"data")
+    with pytest.raises(ValueError, match="closed file"):
+        writer.flush()
+    with pytest.raises(ValueError, match="closed file"):
+        writer.close()
+
+
+def test_id_reserve() -> None:
+    id_counter = Id(1000)
+    assert id_counter.reserve(5) == 1000
+    assert id_counter.reserve(0) == 1005
+    assert id_counter.getId() == 1005
+    assert id_counter.curId == 1006
+
+
+def test_make_nodes_ways(tile_contours: TileContours) -> None:
+    """Nodes of all the paths are returned in a single scaled array."""
+    id_counter = Id(1000)
+    nodes, ways = make_nodes_ways(tile_contours.contours[0], 0, id_counter, 10)
+    numpy.testing.assert_array_equal(
+        nodes,
+        # Last node of the closed loop isn't repeated
+        [[10, 10], [10, 20], [20, 20], [20, 10], [30, 10], [30, 20]],
+    )
+    assert nodes.dtype == numpy.int32
+    assert ways.tolist() == [(1000, 4, True, 0), (1004, 2, False, 0)]
+    assert id_counter.curId == 1006
+
+
+def test_make_ways() -> None:
+    """Ways nodes IDs are allocated contiguously, elevation may be negative."""
+    ways = make_ways(2147483647, [3, 2, 5], [True, False, False], [-20, 0, 20])
+    assert ways.tolist() == [
+        (2147483647, 3, True, -20),
+        (2147483650, 2, False, 0),
+        (2147483652, 5, False, 20),
+    ]
@@ -0,0 +1,32 @@
+import numpy
+import pytest
+
+from pyhgtmap.varint import int2str, int_array2str, sint2str, sint_array2str
+
+
+@pytest.mark.parametrize(
+    "values",
+    [
+        [0],
+        [1, 127, 128, 300, 2**32, 2**63, 2**64 - 1],
+    ],
+)
+def test_int_array2str(values: list[int]) -> None:
+    encoded, lengths = int_array2str(numpy.array(values, dtype=numpy.uint64))
+    assert [row[:length].tobytes() for row, length in zip(encoded, lengths)] == [
+        int2str(value) for value in values
+    ]
+
+
+@pytest.mark.parametrize(
+    "values",
+    [
+        [0],
+        [1, -1, 63, -64, 64, -65, 2**31, -(2**31), 2**63 - 1, -(2**63)],
+    ],
+)
+def test_sint_array2str(values: list[int]) -> None:
+    encoded, lengths = sint_array2str(numpy.array(values, dtype=numpy.int64))
+    assert [row[:length].tobytes() for row, length in zip(encoded, lengths)] == [
+        sint2str(value) for value in values
+    ]